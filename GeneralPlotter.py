@@ -21,146 +21,1442 @@ will be the fitting parameters with uncertainties and the reduced chi squared va
 """
 
 #imports list
+import ast
+import copy
+import importlib
 import numpy as np
-import matplotlib.pyplot as plt
 from math import *
-from scipy import optimize
-from IPython import get_ipython
-from tkinter import *
-import webbrowser
-
-get_ipython().run_line_magic('matplotlib', 'qt') #set graphs to display in window instead of console
-
-#fitting function for custom mode, takes argument of the x values and unpacks a list of arguments that are the fitting parameters
-def fitting(xvals,*arglist):
-    global equation, userfittingparams, firstrun, oldparams #access required globals
-    if(firstrun==True): #if this is the first attempt at fitting
-        #loop over and replace all of the fitting parameters with their guess values 
-        for i in range(0,len(userfittingparams)):
-            equation = equation.replace(str(userfittingparams[i]),str(arglist[i]))
-        oldparams = arglist #set the old version of the parameters to their current version
-        firstrun = False #mark the first run is completed
-    else: #if not the first run
-        #loop over the old fitting parameter values and replacec with the new estimate by the optimising function
-        for i in range(0,len(userfittingparams)):
-            equation = equation.replace(str(oldparams[i]),str(arglist[i]))
-        oldparams = arglist #update list of the old parameters
-    #define empty list of y valyes for the updated equation
-    vallist = []
-    for i in range(0,len(xvals)): #loop over the x values
-        newequation = equation.replace('x',str(xvals[i])) #replace references to x with the current x value fromthe list
-        if(str('e'+str(xvals[i])+'p') in newequation): #a fix to prevent replacing the x in exp command being raplced by a number 
-            newequation = newequation.replace(str('e'+str(xvals[i])+'p'),'exp')
-        else:
-            pass
-        val = eval(newequation) #calculate the y value of this point
-        vallist.append(val) #append the y value to the list
-    return vallist #return the y values to the optimisation function for comparison
-    
-#function to fit and plot a polynomial to the data
-def powerplot(xvals, yvals, error, power, xtitle, ytitle, plottitle, outfilepath, gradpoints, mstyle, mcolour, ecolour1, lstyle, msize):
-    #this has already been validated to work so float the power
+import argparse
+import hashlib
+import json
+import csv
+import glob
+import os
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+import threading
+import time
+
+#a module that is only imported the first time one of its attributes is used, scipy and pyplot take seconds to import so loading them when a fit or graph first needs them lets the window appear straight away
+#onload, if set, is called with the module once it has been imported and before it is first used
+class lazymodule:
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+        self.onload = None
+    def __getattr__(self, attribute):
+        if(self.module is None):
+            module = importlib.import_module(self.name)
+            if(self.onload is not None):
+                self.onload(module)
+            self.module = module
+        return getattr(self.module, attribute)
+
+plt = lazymodule('matplotlib.pyplot')
+optimize = lazymodule('scipy.optimize')
+stats = lazymodule('scipy.stats')
+qmc = lazymodule('scipy.stats.qmc')
+sparse = lazymodule('scipy.sparse')
+webbrowser = lazymodule('webbrowser')
+pyarrow = lazymodule('pyarrow')
+parquet = lazymodule('pyarrow.parquet')
+feather = lazymodule('pyarrow.feather')
+
+#when the gui is run inside ipython show graphs in their own window instead of in the console, called as pyplot is first loaded so ipython is only looked for if a graph is drawn and is not needed at all
+def ipythonbackend(module):
+    try:
+        from IPython import get_ipython
+        get_ipython().run_line_magic('matplotlib', 'qt')
+    except:
+        pass
+
+#functions and constants a custom law equation is allowed to use, mapped to their vectorised numpy versions so a whole array of x values is evaluated at once
+equationfunctions = {'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan, 'atan2': np.arctan2,
+                     'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh, 'asinh': np.arcsinh, 'acosh': np.arccosh, 'atanh': np.arctanh,
+                     'exp': np.exp, 'expm1': np.expm1, 'log': np.log, 'log10': np.log10, 'log2': np.log2, 'log1p': np.log1p,
+                     'sqrt': np.sqrt, 'fabs': np.abs, 'abs': np.abs, 'hypot': np.hypot, 'degrees': np.degrees, 'radians': np.radians}
+equationconstants = {'pi': np.pi, 'e': np.e, 'tau': 2*np.pi}
+
+#syntax tree transformer that rewrites the two argument log(x,a) as log(x)/log(a)
+class logbase(ast.NodeTransformer):
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if(node.func.id=='log' and len(node.args)==2):
+            logx = ast.Call(func=ast.Name(id='log',ctx=ast.Load()),args=[node.args[0]],keywords=[])
+            loga = ast.Call(func=ast.Name(id='log',ctx=ast.Load()),args=[node.args[1]],keywords=[])
+            return ast.BinOp(left=logx,op=ast.Div(),right=loga)
+        return node
+
+#parse a custom law equation string into a syntax tree, only allowing arithmetic, numbers, names and calls to the functions listed above
+def parseequation(equation):
+    #some catches to try and fix common formatting errors
+    equation = equation.replace('^','**')
+    equation = equation.replace('arcsin','asin')
+    equation = equation.replace('arccos','acos')
+    equation = equation.replace('arctan','atan')
+    try:
+        tree = ast.parse(equation.strip(), mode='eval')
+    except SyntaxError:
+        raise ValueError('The equation could not be read, check that every bracket is closed and every operator has a value either side of it.')
+    for node in ast.walk(tree): #check every part of the equation is something that is safe and sensible to evaluate
+        if(isinstance(node,ast.Call)):
+            if(not isinstance(node.func,ast.Name) or node.func.id not in equationfunctions or node.keywords!=[]):
+                raise ValueError('The equation calls a function that is not recognised, see the Custom Help window for the list of functions that can be used.')
+        elif(isinstance(node,ast.Constant)):
+            if(type(node.value) not in (int,float)):
+                raise ValueError('The equation contains a value that is not a number.')
+        elif(not isinstance(node,(ast.Expression,ast.BinOp,ast.UnaryOp,ast.Name,ast.Load,ast.Add,ast.Sub,ast.Mult,ast.Div,ast.Pow,ast.USub,ast.UAdd))):
+            raise ValueError('The equation contains something that is not allowed, only numbers, x, fitting parameters, +, -, *, /, ** and the functions in the Custom Help window can be used.')
+    tree = logbase().visit(tree) #rewrite log(x,a) as log(x)/log(a) as the numpy log only takes one argument
+    return ast.fix_missing_locations(tree)
+
+#return the set of names used in a parsed equation that are not functions, used to check that every fitting parameter appears in the equation
+def equationnames(tree):
+    functionnames = set(node.func.id for node in ast.walk(tree) if isinstance(node,ast.Call))
+    return set(node.id for node in ast.walk(tree) if isinstance(node,ast.Name)) - functionnames
+
+#derivatives of the single argument equation functions written in terms of their argument u, used for the chain rule when differentiating an equation
+derivativetemplates = {'sin': 'cos(u)', 'cos': '-sin(u)', 'tan': '1/cos(u)**2', 'asin': '1/sqrt(1-u**2)', 'acos': '-1/sqrt(1-u**2)', 'atan': '1/(1+u**2)',
+                       'sinh': 'cosh(u)', 'cosh': 'sinh(u)', 'tanh': '1/cosh(u)**2', 'asinh': '1/sqrt(u**2+1)', 'acosh': '1/sqrt(u**2-1)', 'atanh': '1/(1-u**2)',
+                       'exp': 'exp(u)', 'expm1': 'exp(u)', 'log': '1/u', 'log10': '1/(u*log(10))', 'log2': '1/(u*log(2))', 'log1p': '1/(1+u)',
+                       'sqrt': '0.5/sqrt(u)', 'fabs': 'u/abs(u)', 'abs': 'u/abs(u)', 'degrees': '180/pi', 'radians': 'pi/180'}
+
+#syntax tree transformer that substitutes a node in place of every u in a derivative template
+class substitute(ast.NodeTransformer):
+    def __init__(self, node):
+        self.node = node
+    def visit_Name(self, node):
+        if(node.id=='u'):
+            return copy.deepcopy(self.node)
+        return node
+
+#small helpers to build syntax tree nodes for derivatives, folding zeros and ones so the derivative does not grow needlessly
+def isnumber(node, value):
+    return isinstance(node,ast.Constant) and node.value==value
+
+def addnode(a, b):
+    if(isnumber(a,0)):
+        return b
+    if(isnumber(b,0)):
+        return a
+    return ast.BinOp(left=a,op=ast.Add(),right=b)
+
+def subnode(a, b):
+    if(isnumber(b,0)):
+        return a
+    if(isnumber(a,0)):
+        return ast.UnaryOp(op=ast.USub(),operand=b)
+    return ast.BinOp(left=a,op=ast.Sub(),right=b)
+
+def mulnode(a, b):
+    if(isnumber(a,0) or isnumber(b,0)):
+        return ast.Constant(value=0)
+    if(isnumber(a,1)):
+        return b
+    if(isnumber(b,1)):
+        return a
+    return ast.BinOp(left=a,op=ast.Mult(),right=b)
+
+def divnode(a, b):
+    if(isnumber(a,0)):
+        return ast.Constant(value=0)
+    if(isnumber(b,1)):
+        return a
+    return ast.BinOp(left=a,op=ast.Div(),right=b)
+
+#differentiate a parsed equation with respect to the variable named var using the usual rules of calculus, returning a new syntax tree
+def differentiate(node, var):
+    if(isinstance(node,ast.Expression)):
+        return ast.Expression(body=differentiate(node.body,var))
+    if(isinstance(node,ast.Constant)):
+        return ast.Constant(value=0)
+    if(isinstance(node,ast.Name)): #the variable itself has a derivative of one, every other name is constant
+        return ast.Constant(value=int(node.id==var))
+    if(isinstance(node,ast.UnaryOp)):
+        du = differentiate(node.operand,var)
+        if(isinstance(node.op,ast.USub) and not isnumber(du,0)):
+            return ast.UnaryOp(op=ast.USub(),operand=du)
+        return du
+    if(isinstance(node,ast.BinOp)):
+        a, b = node.left, node.right
+        da, db = differentiate(a,var), differentiate(b,var)
+        if(isinstance(node.op,ast.Add)):
+            return addnode(da,db)
+        if(isinstance(node.op,ast.Sub)):
+            return subnode(da,db)
+        if(isinstance(node.op,ast.Mult)): #product rule
+            return addnode(mulnode(da,b),mulnode(a,db))
+        if(isinstance(node.op,ast.Div)): #quotient rule
+            return subnode(divnode(da,b),divnode(mulnode(a,db),ast.BinOp(left=b,op=ast.Pow(),right=ast.Constant(value=2))))
+        if(isinstance(node.op,ast.Pow)):
+            if(isnumber(db,0)): #power rule when the exponent does not depend on the variable
+                return mulnode(mulnode(b,ast.BinOp(left=a,op=ast.Pow(),right=subnode(b,ast.Constant(value=1)))),da)
+            logterm = mulnode(db,ast.Call(func=ast.Name(id='log',ctx=ast.Load()),args=[a],keywords=[]))
+            return mulnode(node,addnode(logterm,divnode(mulnode(b,da),a)))
+    if(isinstance(node,ast.Call)):
+        name = node.func.id
+        if(len(node.args)==2): #the two argument functions are differentiated directly
+            a, b = node.args
+            da, db = differentiate(a,var), differentiate(b,var)
+            if(name=='atan2'):
+                numerator = subnode(mulnode(b,da),mulnode(a,db))
+                denominator = addnode(ast.BinOp(left=a,op=ast.Pow(),right=ast.Constant(value=2)),ast.BinOp(left=b,op=ast.Pow(),right=ast.Constant(value=2)))
+                return divnode(numerator,denominator)
+            if(name=='hypot'):
+                return divnode(addnode(mulnode(a,da),mulnode(b,db)),node)
+        du = differentiate(node.args[0],var)
+        if(isnumber(du,0)):
+            return du
+        outer = substitute(node.args[0]).visit(ast.parse(derivativetemplates[name],mode='eval').body) #derivative of the function evaluated at its argument
+        return mulnode(outer,du) #chain rule
+    raise ValueError('The equation could not be differentiated.')
+
+#compile a syntax tree once into a function that evaluates it for an array of x values and a list of fitting parameter values bound by name
+def compiletree(tree, userfittingparams):
+    code = compile(ast.fix_missing_locations(tree),'<equation>','eval') #compile once so each call is a single vectorised evaluation
+    namespace = dict(equationfunctions)
+    namespace.update(equationconstants)
+    def evaluate(xvals, arglist):
+        values = dict(namespace)
+        values.update(zip(userfittingparams,arglist)) #bind the parameter values by name so no text replacement is needed
+        values['x'] = xvals
+        with np.errstate(all='ignore'): #invalid values become nan rather than warnings, the optimiser will steer away from them
+            return eval(code,{'__builtins__': {}},values)
+    return evaluate
+
+#compile a custom law equation once into a fitting function that takes an array of x values and unpacks a list of arguments that are the fitting parameters
+def compileequation(equation, userfittingparams):
+    tree = parseequation(equation)
+    userfittingparams = [str(i).strip() for i in userfittingparams]
+    unknown = equationnames(tree) - set(userfittingparams) - set(equationconstants) - {'x'}
+    if(unknown!=set()): #any other name would fail to evaluate so report it now rather than during the fit
+        raise ValueError('The equation uses the names %s which are not x, a fitting parameter or a known constant.' % ', '.join(sorted(unknown)))
+    evaluate = compiletree(tree,userfittingparams)
+    def fitting(xvals,*arglist):
+        xvals = np.asarray(xvals,dtype=float)
+        vallist = evaluate(xvals,arglist)
+        if(np.ndim(vallist)==0): #if the equation does not depend on x give a value for every point
+            vallist = np.full(np.shape(xvals),float(vallist))
+        return vallist #return the y values to the optimisation function for comparison
+    return fitting
+
+#compile the jacobian of a custom law equation, the derivative with respect to each fitting parameter is found symbolically once and all of them are evaluated together
+def compilejacobian(equation, userfittingparams):
+    tree = parseequation(equation)
+    userfittingparams = [str(i).strip() for i in userfittingparams]
+    derivatives = ast.Expression(body=ast.Tuple(elts=[differentiate(tree.body,i) for i in userfittingparams],ctx=ast.Load()))
+    evaluate = compiletree(derivatives,userfittingparams)
+    def jacobian(xvals,*arglist):
+        xvals = np.asarray(xvals,dtype=float)
+        columns = evaluate(xvals,arglist)
+        jac = np.empty((len(xvals),len(columns))) #one row per x value and one column per fitting parameter as curve_fit expects
+        for i in range(0,len(columns)):
+            jac[:,i] = columns[i] #constant derivatives are broadcast down the whole column
+        return jac
+    return jacobian
+
+#compile the gradient dy/dx of a custom law equation along with the derivatives of that gradient with respect to each fitting parameter, used to propagate the parameter covariance to the gradient
+def compilegradient(equation, userfittingparams):
+    tree = parseequation(equation)
+    userfittingparams = [str(i).strip() for i in userfittingparams]
+    slope = differentiate(tree.body,'x')
+    derivatives = ast.Expression(body=ast.Tuple(elts=[slope]+[differentiate(slope,i) for i in userfittingparams],ctx=ast.Load()))
+    evaluate = compiletree(derivatives,userfittingparams)
+    def gradient(xvals,*arglist):
+        xvals = np.asarray(xvals,dtype=float)
+        columns = evaluate(xvals,arglist)
+        jac = np.empty((len(xvals),len(columns)-1))
+        for i in range(1,len(columns)):
+            jac[:,i-1] = columns[i]
+        return np.broadcast_to(columns[0],np.shape(xvals)).astype(float), jac
+    return gradient
+
+#compile the gradient dy/dx of a custom law equation on its own, for fits that move the x values and need the slope at each one
+def compileslope(equation, userfittingparams):
+    tree = parseequation(equation)
+    userfittingparams = [str(i).strip() for i in userfittingparams]
+    evaluate = compiletree(ast.Expression(body=differentiate(tree.body,'x')),userfittingparams)
+    def slope(xvals,*arglist):
+        xvals = np.asarray(xvals,dtype=float)
+        return np.broadcast_to(evaluate(xvals,arglist),np.shape(xvals)).astype(float)
+    return slope
+
+#compile a custom law so it is evaluated for many sets of fitting parameters at once, each row of the parameter array gives a row of y values
+def compilebatch(equation, userfittingparams):
+    tree = parseequation(equation)
+    userfittingparams = [str(i).strip() for i in userfittingparams]
+    evaluate = compiletree(tree,userfittingparams)
+    def batch(xvals, paramsets):
+        xvals = np.asarray(xvals,dtype=float)
+        paramsets = np.atleast_2d(paramsets)
+        vallist = evaluate(xvals,[paramsets[:,i:i+1] for i in range(0,paramsets.shape[1])]) #parameter columns of shape (k,1) broadcast against the x values to give a (k,N) array
+        return np.broadcast_to(vallist,(len(paramsets),len(xvals)))
+    return batch
+
+#find the first line of a data file that cannot be used, only called once the fast reader has failed so it can tell the user where to look
+def findbadline(filepath):
+    columns = None
+    with open(filepath,'r') as file:
+        for number, line in enumerate(file,start=1):
+            if(line.strip()==''): #blank lines are skipped
+                continue
+            contents = line.split(',')
+            try:
+                [float(i) for i in contents]
+            except ValueError:
+                return 'Line %d of the file contains a value that is not a number: %s' % (number,line.strip())
+            if(len(contents) not in (3,4)):
+                return 'Line %d of the file has %d values, each line should be x,y,y_err or x,y,y_err,x_err.' % (number,len(contents))
+            if(columns is not None and len(contents)!=columns):
+                return 'Line %d of the file has %d values but the lines before it have %d.' % (number,len(contents),columns)
+            columns = len(contents)
+    return 'At least one value in the file is unable to be used.'
+
+#split a two dimensional array of data into x, y, y_err and x_err columns without copying, the array can hold one column per row or one per column
+def splitcolumns(data):
+    if(data.ndim!=2 or (data.shape[0] not in (3,4) and data.shape[1] not in (3,4))):
+        raise ValueError('Binary data should be a two dimensional array of x, y, y_err and optionally x_err, found an array of shape %s.' % (data.shape,))
+    if(data.dtype!=np.float64):
+        data = data.astype(np.float64) #other number types have to be copied to double precision
+    if(data.shape[0] not in (3,4)): #one point per row, as the text files are laid out
+        data = data.T
+    xerr = data[3] if data.shape[0]==4 else None
+    return data[0], data[1], data[2], xerr
+
+#load x, y, y_err and optional x_err from a binary file, .npy and raw little endian float64 .bin files are memory mapped so nothing is read until it is used
+def readbinary(filepath, columns=3):
+    extension = os.path.splitext(filepath)[1].lower()
+    if(extension=='.npy'):
+        return splitcolumns(np.load(filepath,mmap_mode='r'))
+    if(extension=='.npz'): #arrays stored by name, zip archives cannot be memory mapped so these are read into memory
+        with np.load(filepath) as archive:
+            if('data' in archive.files):
+                return splitcolumns(archive['data'])
+            xerr = archive['xerr'] if 'xerr' in archive.files else None
+            return archive['x'], archive['y'], archive['err'], xerr
+    #raw files hold the points one after another as x,y,y_err(,x_err) little endian doubles with no header
+    if(os.path.getsize(filepath)%(8*columns)!=0):
+        raise ValueError('The binary file size is not a whole number of %d column points of 8 byte floats.' % columns)
+    return splitcolumns(np.memmap(filepath,dtype='<f8',mode='r').reshape(-1,columns))
+
+#read comma separated data formatted as x,y,y_err with an optional fourth x_err column from a .txt or .csv file into contiguous arrays, x_err is None if there is no fourth column
+def readdata(filepath, columns=3):
+    if(os.path.splitext(filepath)[1].lower() in ('.npy','.npz','.bin')): #binary formats for very large datasets
+        return readbinary(filepath,columns)
+    try: #parse the whole file in one go with numpy's compiled reader
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore') #an empty file is reported by the caller as having too few points
+            data = np.loadtxt(filepath,delimiter=',',dtype=np.float64,ndmin=2)
+    except ValueError:
+        raise ValueError(findbadline(filepath)) #go back over the file line by line to report which line is wrong
+    if(data.size==0):
+        empty = np.empty(0)
+        return empty, empty, empty, None
+    if(data.shape[1] not in (3,4)):
+        raise ValueError(findbadline(filepath))
+    x = np.ascontiguousarray(data[:,0])
+    y = np.ascontiguousarray(data[:,1])
+    err = np.ascontiguousarray(data[:,2])
+    xerr = np.ascontiguousarray(data[:,3]) if data.shape[1]==4 else None
+    return x, y, err, xerr
+
+#convert a comma separated text data file to a .npy file holding one column per row, so that later loads are memory mapped instead of parsed
+def convertdata(filepath, outpath=None):
+    if(outpath is None):
+        outpath = os.path.splitext(filepath)[0]+'.npy'
+    x, y, err, xerr = readdata(filepath)
+    columns = [x,y,err] if xerr is None else [x,y,err,xerr]
+    np.save(outpath,np.vstack(columns).astype('<f8'))
+    return outpath
+
+#work out the residuals, chi squared and parameter uncertainties of a fit from the model evaluated once at every point, all as whole array operations
+#for an unweighted fit the covariance is rescaled using the chi squared, for a weighted fit the errors were used in the fit so it is already in the right units
+def fitstatistics(yvals, fitvals, error, cov, weighted=False):
+    residuals = np.asarray(yvals) - fitvals #work out an array of residuals
+    chi2data = (residuals/error)**2 #contribution of each point to chi squared, kept for more thorough analysis if user wants to investigate through the code
+    chi2 = np.sum(chi2data) #total chi squared
+    N = len(residuals)-len(cov) #work out degrees of freedom as number of points subtract the number of fitting parameters
+    redchi2 = chi2/N #calculate a reduced chi squared as chi squared over the degrees of freedom
+    if(weighted):
+        cov2 = cov
+    else:
+        cov2 = cov*(N-2)/chi2 #calculate a truer covariance matrix of the fitting parameters
+    fittingerror = np.sqrt(np.diag(cov2)) #get the uncertainties on the fitting parameters
+    return {'errors': fittingerror, 'cov': cov2, 'fitcov': cov, 'chi2': chi2, 'chi2data': chi2data, 'dof': N, 'redchi2': redchi2, 'fitvals': fitvals, 'residuals': residuals}
+
+#factor an unweighted fit's inverse normal matrix is scaled by to give its covariance, the scaling by the scatter of the residuals curve_fit and polyfit make followed by the rescaling in fitstatistics
+#fits worked out without curve_fit or polyfit use it so their uncertainties agree with those fits on the same data
+def unweightedscale(residuals, error, dof):
+    return np.sum(np.asarray(residuals)**2)/dof*(dof-2)/np.sum((np.asarray(residuals)/error)**2)
+
+#name each polynomial coefficient by its power of x for display, highest power first, a linear fit is named as a gradient and intercept
+def polynomialnames(power):
+    if(power==1):
+        return ['m','c']
+    return ['x^%s Coefficient' % i for i in range(power,1,-1)] + ['x Coefficient','y Intercept']
+
+#fit a polynomial of the given power to the data and return the fitting parameters, their uncertainties and the fit statistics in a dictionary
+#a weighted fit weights each point by its y error and takes the errors as absolute, otherwise the fit is unweighted and the covariance is rescaled from the chi squared
+#any basis other than power fits in x scaled onto -1 to 1 with basisfit, which is needed for high powers or x values far from zero
+def polynomialfit(xvals, yvals, error, power, weighted=False, basis='power'):
     power  = int(power)
+    if(basis!='power'):
+        return basisfit(xvals,yvals,error,power,weighted,basis)
+    if(weighted): #weight each point by one over its error so points with large error bars pull the fit less
+        p, cov = np.polyfit(xvals, yvals, power, w = 1/np.asarray(error), cov = 'unscaled')
+    else: #calculate a polyfit of the x and y values to whatever order the user has specified and return the parameters and covariance matrix
+        p, cov = np.polyfit(xvals, yvals, power, cov = True)
+    results = fitstatistics(yvals, np.polyval(p, xvals), error, cov, weighted)
+    results.update({'mode': 'polynomial', 'power': power, 'weighted': weighted, 'names': polynomialnames(power), 'params': p})
+    return results
+
+#numpy series class and vandermonde function of each basis a polynomial can be fitted in, all of them in x mapped from the range of the data onto -1 to 1
+polynomialbases = {'scaled': (np.polynomial.Polynomial, np.polynomial.polynomial.polyvander), 'chebyshev': (np.polynomial.Chebyshev, np.polynomial.chebyshev.chebvander),
+                   'legendre': (np.polynomial.Legendre, np.polynomial.legendre.legvander)}
+
+#fit a polynomial in x mapped onto -1 to 1 and in a scaled power, chebyshev or legendre basis, which stays well conditioned for high powers and x values far from zero such as timestamps
+#the coefficients and covariance are converted back to the power basis for display, the fit itself is evaluated and differentiated in its own basis so no precision is lost doing so
+def basisfit(xvals, yvals, error, power, weighted=False, basis='chebyshev'):
+    series, vander = polynomialbases[basis]
+    xvals, yvals, error = np.asarray(xvals,dtype=float), np.asarray(yvals,dtype=float), np.asarray(error,dtype=float)
+    power = int(power)
+    order = power+1
+    domain = [float(np.min(xvals)),float(np.max(xvals))]
+    if(domain[0]==domain[1]): #every x the same, which cannot be fitted anyway, but avoid dividing by zero
+        domain[1] = domain[0]+1.0
+    offset, scale = np.polynomial.polyutils.mapparms(domain,[-1,1])
+    weights = 1/error if weighted else np.ones(len(xvals))
+    q, r = np.linalg.qr(vander(offset+scale*xvals,power)*weights[:,None])
+    rinv = np.linalg.inv(r)
+    coeffs = rinv @ (q.T @ (yvals*weights)) #coefficients of the basis functions, lowest first
+    cov = rinv @ rinv.T
+    fitvals = series(coeffs,domain)(xvals)
+    if(not weighted): #scale the covariance the same way as polyfit does
+        cov = cov*np.sum((yvals-fitvals)**2)/(len(xvals)-order)
+    
+    #column k holds the power coefficients of x, highest first, of the kth basis function so the conversion is linear and the covariance converts with it
+    transform = np.zeros((order,order))
+    for k in range(0,order):
+        powers = series.basis(k,domain).convert(kind=np.polynomial.Polynomial).coef
+        transform[order-len(powers):,k] = powers[::-1]
+    p = transform @ coeffs
+    results = fitstatistics(yvals,fitvals,error,transform @ cov @ transform.T,weighted)
+    basiscov = cov if weighted else cov*(results['dof']-2)/results['chi2'] #rescaled the same way as the power basis covariance
+    results.update({'mode': 'polynomial', 'power': power, 'weighted': weighted, 'names': polynomialnames(power), 'params': p,
+                    'basis': basis, 'domain': domain, 'basisparams': coeffs, 'basiscov': basiscov})
+    return results
+
+#fit every polynomial power from 1 up to maxpower from one QR factorisation and pick the highest power whose extra term is significant by the F-test
+#the columns of the vandermonde matrix are in rising powers so each lower power fit uses the leading columns of the same factorisation, its residual sum of squares drops out of the projected y values
+#each power is reported with its reduced chi squared, AIC, BIC and the F-test probability that adding its highest term improved the fit by chance, and the best power is returned as polynomialfit would
+def selectpolynomial(xvals, yvals, error, maxpower, weighted=False, significance=0.05):
+    xvals, yvals, error = np.asarray(xvals,dtype=float), np.asarray(yvals,dtype=float), np.asarray(error,dtype=float)
+    n = len(xvals)
+    maxpower = min(int(maxpower),n-3) #leave at least two degrees of freedom for the highest power
+    if(maxpower<1):
+        raise ValueError('At least 4 data points are needed to compare polynomial powers.')
+    centre = (np.max(xvals)+np.min(xvals))/2
+    scale = (np.max(xvals)-np.min(xvals))/2 or 1.0
+    weights = 1/error if weighted else np.ones(n)
+    q, r = np.linalg.qr(np.vander((xvals-centre)/scale,maxpower+1,increasing=True)*weights[:,None]) #the single factorisation every power shares
+    qty = q.T @ (yvals*weights)
+    total = np.sum((yvals*weights)**2)
+    fitted = np.zeros(n)
+    powers = np.arange(1,maxpower+1)
+    rss, chi2 = np.empty(maxpower), np.empty(maxpower)
+    fitted += q[:,0]*qty[0]
+    for power in powers: #add one column of the projection at a time
+        fitted += q[:,power]*qty[power]
+        rss[power-1] = max(total-np.sum(qty[:power+1]**2),0.0)
+        chi2[power-1] = np.sum(((yvals-fitted/weights)/error)**2)
+    k = powers+1 #number of fitting parameters
+    if(weighted): #with known errors the likelihood follows from chi squared
+        aic, bic = rss+2*k, rss+k*np.log(n)
+    else: #otherwise the error size is estimated from the residuals as well
+        aic, bic = n*np.log(rss/n)+2*k, n*np.log(rss/n)+k*np.log(n)
+    previous = np.concatenate([[total-qty[0]**2],rss[:-1]]) #the power below, a constant for the linear fit
+    fstat = (previous-rss)/(rss/(n-k))
+    fprob = stats.f.sf(fstat,1,n-k)
+    significant = powers[fprob<significance]
+    best = int(significant[-1]) if len(significant)>0 else 1 #a power with no significant term of its own, such as the x^2 of a cubic, does not stop a higher one being chosen
+    
+    order = best+1
+    rinv = np.linalg.inv(r[:order,:order]) #the best fit from the leading block of the factorisation, highest power first as polyfit gives
+    coeffs = (rinv @ qty[:order])[::-1]
+    cov = (rinv @ rinv.T)[::-1,::-1]
+    if(not weighted): #scale the covariance the same way as polyfit does
+        cov = cov*rss[best-1]/(n-order)
+    transform = powertransform(best,centre,scale)
+    p = transform @ coeffs
+    results = fitstatistics(yvals,np.polyval(p,xvals),error,transform @ cov @ transform.T,weighted)
+    results.update({'mode': 'polynomial', 'power': best, 'weighted': weighted, 'names': polynomialnames(best), 'params': p,
+                    'selection': {'powers': powers, 'redchi2': chi2/(n-k), 'aic': aic, 'bic': bic, 'fstat': fstat, 'fprob': fprob, 'best': best}})
+    return results
+
+#matrix taking polynomial coefficients in the scaled x=(x-centre)/scale to coefficients in x, both highest power first, as it is linear the covariance transforms with it too
+def powertransform(power, centre, scale):
+    order = power+1
+    transform = np.zeros((order,order))
+    for k in range(0,order): #expand ((x-centre)/scale)^k with the binomial theorem
+        for j in range(0,k+1):
+            transform[power-j,power-k] = comb(k,j)*(-centre)**(k-j)/scale**k
+    return transform
+
+#read the points added to a data file since the byte or point offset stored in a streaming fit state, in chunks of at most chunkpoints points, moving the offset on as it goes
+def readchunks(state, chunkpoints):
+    filepath = state['file']
+    extension = os.path.splitext(filepath)[1].lower()
+    if(extension in ('.npy','.npz','.bin')): #binary files are memory mapped so a chunk is just a slice of the mapped columns
+        x, y, err, xerr = readdata(filepath,state['columns'])
+        while(state['offset']<len(x)):
+            end = min(state['offset']+chunkpoints,len(x))
+            yield np.asarray(x[state['offset']:end]), np.asarray(y[state['offset']:end]), np.asarray(err[state['offset']:end])
+            state['offset'] = end
+        return
+    with open(filepath,'rb') as file: #text files are read in blocks of bytes and only complete lines are parsed
+        file.seek(state['offset'])
+        while(True):
+            block = file.read(chunkpoints*64) #roughly chunkpoints lines of comma separated numbers
+            end = block.rfind(b'\n')+1
+            if(len(block)<chunkpoints*64 and not state.get('growing',False)): #the end of a file that is not being written to also ends its last line
+                end = len(block)
+            if(end==0): #no complete line left, a partly written last line is left for the next update
+                if(len(block)==chunkpoints*64):
+                    raise ValueError('A line of the data file is too long to be read.')
+                return
+            file.seek(state['offset']+end)
+            lines = block[:end].decode().splitlines()
+            try:
+                data = np.loadtxt(lines,delimiter=',',dtype=np.float64,ndmin=2)
+            except ValueError:
+                raise ValueError(findbadline(filepath))
+            state['offset'] += end
+            if(data.size!=0):
+                yield data[:,0], data[:,1], data[:,2]
+
+#start a streaming polynomial fit of a data file that may be larger than memory, the file is read in chunks and only the sums needed for the least squares solution are kept
+def streampolyfit(filepath, power, chunkpoints=1000000, columns=3, weighted=False):
+    state = {'file': filepath, 'columns': columns, 'power': int(power), 'weighted': weighted, 'offset': 0, 'n': 0, 'centre': None, 'scale': None}
+    return updatestreamfit(state,chunkpoints)
+
+#add the points appended to the file since the last update to a streaming fit state, so a growing file only has its new rows read
+def updatestreamfit(state, chunkpoints=1000000):
+    for x, y, err in readchunks(state,chunkpoints):
+        addstreampoints(state,x,y,err)
+    return state
+
+#add a chunk of points to the sums held by a streaming polynomial fit state
+def addstreampoints(state, x, y, err):
+    order = state['power']+1
+    if(state['centre'] is None): #fix the centre and scale of x from the first chunk so the powers of x stay well conditioned
+        state['centre'] = float(np.mean(x))
+        state['scale'] = float(np.max(np.abs(x-state['centre']))) or 1.0
+        state['yoffset'] = float(np.mean(y)) #subtracting a typical y value keeps the sums of squares from cancelling
+        for key in ('ata','wata'):
+            state[key] = np.zeros((order,order))
+        for key in ('aty','waty'):
+            state[key] = np.zeros(order)
+        state['yty'] = 0.0
+        state['wyty'] = 0.0
+    a = np.vander((x-state['centre'])/state['scale'],order) #vandermonde matrix of the scaled x values, highest power first as polyfit uses
+    y = y-state['yoffset']
+    w = 1/np.asarray(err)**2
+    state['ata'] += a.T @ a #normal equations of the unweighted fit
+    state['aty'] += a.T @ y
+    state['yty'] += y @ y
+    wa = a*w[:,None]
+    state['wata'] += a.T @ wa #weighted sums so the chi squared of the fit can be found without the points
+    state['waty'] += wa.T @ y
+    state['wyty'] += (w*y) @ y
+    state['n'] += len(x)
+    return state
+
+#turn the sums held by a streaming fit state into the same dictionary of results as polynomialfit, apart from the per point values
+def streamfitresults(state):
+    power = state['power']
+    order = power+1
+    n = state['n']
+    if(n<=order):
+        raise ValueError('At least %d data points are needed to fit a polynomial of power %d.' % (order+1,power))
+    if(state['weighted']): #solve the weighted normal equations, the covariance follows directly from the errors
+        coeffs = np.linalg.solve(state['wata'],state['waty'])
+        chi2 = state['wyty']-coeffs @ state['waty']
+        cov = np.linalg.inv(state['wata'])
+    else:
+        coeffs = np.linalg.solve(state['ata'],state['aty']) #coefficients in powers of the scaled x
+        rss = max(state['yty']-coeffs @ state['aty'],0.0) #residual sum of squares from the normal equations
+        chi2 = state['wyty']-2*coeffs @ state['waty']+coeffs @ state['wata'] @ coeffs
+        cov = np.linalg.inv(state['ata'])*rss/(n-order) #covariance scaled the same way as polyfit does
     
-    #plot a new figure 1
-    fig1 = plt.figure(1,figsize=(9,6))
-    plt.subplot(211) #add a subplot for fit
-    #plot the real data values with error bars and no line with set marker size and colours
-    plt.errorbar(xvals, yvals, yerr = error, color = mcolour, ecolor = ecolour1, linestyle = 'None', marker = mstyle, markersize = msize)
-    plt.grid(True) #add a grid
-    plt.xlabel(xtitle) #add an x label to the graph from the user input
-    plt.ylabel(ytitle) # add a y label to the graph from the user input
-    plt.title(plottitle) #add a title to the graph from the user input
-    plt.tight_layout() #stop labels from overlapping
-    
-    #calculate a polyfit of the x and y values to whatever order the user has specified and return the parameters and covariance matrix
-    p, cov = np.polyfit(xvals, yvals, power, cov = True)
-    fitp = np.polyval(p, xvals) #calculate new y values from the x values and the fitting parameters
-    plt.plot(xvals, fitp, linestyle = lstyle) #plot the calulated fitting line over the data
-    
-    residuals = (yvals - fitp) #work out a list of residuals
-    chi2 = 0 #set initial chi squared as 0
-    chi2data = np.empty(len(yvals), dtype=float) #define list for contribution of each point to be stored for more thorough analysis if user wants to investigate through the code
-    for a in range(0, len(yvals)): #loop over the y values
-        chi2data[a] = ((yvals[a] - fitp[a])/error[a])**2 #calculate chi squared value for that point
-        chi2 += chi2data[a] #add that chi squared value to the existing total
-    N = (len(yvals)-len(p)) #work out degrees of freedom as number of points subtract the number of fitting parameters
+    transform = powertransform(power,state['centre'],state['scale'])
+    p = transform @ coeffs
+    p[-1] += state['yoffset']
+    cov = transform @ cov @ transform.T
+    
+    N = n-order #work out degrees of freedom as number of points subtract the number of fitting parameters
     redchi2 = chi2/N #calculate a reduced chi squared as chi squared over the degrees of freedom
+    cov2 = cov if state['weighted'] else cov*(n-order-2)/chi2 #calculate a truer covariance matrix of the fitting parameters
+    return {'mode': 'polynomial', 'power': power, 'weighted': state['weighted'], 'names': polynomialnames(power), 'params': p, 'errors': np.sqrt(np.diag(cov2)), 'cov': cov2,
+            'chi2': chi2, 'dof': N, 'redchi2': redchi2}
+
+#start a recursive custom law fit from a full fit of the first points of a file, warm started from the guesses, for a file that keeps growing
+#the points fitted are then summed up by the information matrix of the parameters so later points can be added without going back over them
+def startrecursivefit(xvals, yvals, error, equation, userfittingparams, paramguesses, weighted=False):
+    results = customfit(xvals,yvals,error,equation,userfittingparams,paramguesses,weighted)
+    state = {'equation': equation, 'names': list(userfittingparams), 'weighted': weighted, 'fitting': compileequation(equation,userfittingparams),
+             'jacobian': compilejacobian(equation,userfittingparams), 'params': np.asarray(results['params'],dtype=float), 'n': len(xvals), 'nfev': results['nfev'], 'njev': results['njev']}
+    w = 1/np.asarray(error,dtype=float)**2 if weighted else np.ones(len(xvals))
+    jac = state['jacobian'](xvals,*state['params'])
+    state['information'] = jac.T @ (jac*w[:,None])
+    state['cost'] = np.sum(w*(yvals-results['fitvals'])**2) #chi squared in the weights of the fit, and with the errors for the reduced chi squared
+    #chi squared with the errors has a quadratic summary of its own, an unweighted fit does not minimise it so its slope at the parameters is kept as well as its curvature
+    e = 1/np.asarray(error,dtype=float)**2
+    state['chi2'], state['chiinformation'], state['chigradient'] = results['chi2'], jac.T @ (jac*e[:,None]), jac.T @ (e*(results['fitvals']-yvals))
+    return state
+
+#add new points to a recursive custom law fit without refitting the old ones, a few gauss newton steps minimise the quadratic summary of the old points about the last parameters plus the chi squared of the new points
+#so each update only costs as much as the number of new points, the summary is linearised about the parameters at the time each point was added which is exact for a model linear in its parameters
+def addrecursivepoints(state, xvals, yvals, error, steps=5):
+    w = 1/np.asarray(error,dtype=float)**2 if state['weighted'] else np.ones(len(xvals))
+    start, information = state['params'], state['information']
+    params = start
+    for step in range(0,steps):
+        residuals, jac = state['fitting'](xvals,*params)-yvals, state['jacobian'](xvals,*params)
+        change = np.linalg.solve(information+jac.T @ (jac*w[:,None]),-(information @ (params-start)+jac.T @ (w*residuals)))
+        params = params+change
+        state['nfev'], state['njev'] = state['nfev']+1, state['njev']+1
+        if(np.all(np.abs(change)<=1e-10*np.maximum(np.abs(params),1e-10))):
+            break
+    residuals, jac = state['fitting'](xvals,*params)-yvals, state['jacobian'](xvals,*params)
+    move = params-start
+    state['cost'] += move @ information @ move+np.sum(w*residuals**2) #the old points' chi squared rises by the quadratic summary as the parameters move
+    e = 1/np.asarray(error,dtype=float)**2
+    state['chi2'] += 2*state['chigradient'] @ move+move @ state['chiinformation'] @ move+np.sum(e*residuals**2) #the old points' chi squared with the errors moves along its own summary
+    state['chigradient'] = state['chigradient']+state['chiinformation'] @ move+jac.T @ (e*residuals)
+    state['chiinformation'] = state['chiinformation']+jac.T @ (jac*e[:,None])
+    state['information'] = information+jac.T @ (jac*w[:,None])
+    state['params'] = params
+    state['n'] += len(xvals)
+    return state
+
+#turn a recursive custom law fit state into the same dictionary of results as customfit, apart from the per point values
+def recursivefitresults(state):
+    n, P = state['n'], len(state['params'])
+    cov = np.linalg.inv(state['information'])
+    if(not state['weighted']): #scaled by the spread of the residuals as curve_fit does, then as fitstatistics does
+        cov = cov*state['cost']/(n-P)
+        cov = cov*(n-P-2)/state['chi2']
+    return {'mode': 'custom', 'equation': state['equation'], 'weighted': state['weighted'], 'names': state['names'], 'params': state['params'], 'errors': np.sqrt(np.diag(cov)), 'cov': cov,
+            'chi2': state['chi2'], 'dof': n-P, 'redchi2': state['chi2']/(n-P), 'nfev': state['nfev'], 'njev': state['njev']}
+
+#raised inside a fit running behind the window when the user presses cancel, so the fit stops at its next function evaluation
+class FitCancelled(Exception):
+    pass
+
+#stop a fit if the user has cancelled it from the window, progress is None for fits that are not run from the window
+def checkcancel(progress):
+    if(progress is not None and progress['cancel'].is_set()):
+        raise FitCancelled('The fit was cancelled.')
+
+#wrap a fitting or jacobian function so each call is counted for the progress display and checks whether the fit has been cancelled
+def monitorfit(function, progress, key):
+    def monitored(xvals,*arglist):
+        checkcancel(progress)
+        progress[key] += 1
+        return function(xvals,*arglist)
+    return monitored
+
+#apply a function to a list of arguments, spread across a pool of worker processes if more than one worker is asked for, the outputs are returned in the same order as the arguments
+#the pool is checked for a cancel every 100ms, when run in this process the progress dictionary is passed on to the function so it can count evaluations and stop part way through
+def poolmap(function, arguments, workers=1, progress=None):
+    if(workers==0): #zero means use every core
+        workers = os.cpu_count() or 1
+    if(progress is not None):
+        progress.update({'step': 0, 'steps': len(arguments)})
+    if(workers>1 and len(arguments)>1):
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(function,i) for i in arguments]
+            pending = set(futures)
+            while(pending!=set()):
+                finished, pending = wait(pending,timeout=0.1)
+                checkcancel(progress)
+                if(progress is not None):
+                    progress['step'] = len(futures)-len(pending)
+            return [i.result() for i in futures]
+        finally:
+            executor.shutdown(wait=False,cancel_futures=True) #drop any work not yet started if the fit was cancelled
+    outputs = []
+    for i in arguments:
+        outputs.append(function(i,progress))
+        if(progress is not None):
+            progress['step'] += 1
+    return outputs
+
+#fit a custom law equation to the data starting from the parameter guesses and return the same dictionary of results as polynomialfit
+#bounds are a pair of arrays of the lowest and highest value of each parameter, when any are finite curve_fit switches to a method that keeps the parameters inside them
+def customfit(xvals, yvals, error, equation, userfittingparams, paramguesses, weighted=False, bounds=(-np.inf,np.inf), progress=None):
+    fitting = compileequation(equation,userfittingparams)
+    jacobian = compilejacobian(equation,userfittingparams) #derivatives with respect to the fitting parameters so the optimiser does not estimate them numerically
+    if(progress is not None): #count the evaluations, one jacobian per iteration, for the progress display and stop as soon as the fit is cancelled
+        fitting, jacobian = monitorfit(fitting,progress,'nfev'), monitorfit(jacobian,progress,'njev')
+    #optimise the fit where the new y values are calculated from the fitting function, the x and y values are read from the file and the parameter guesses are specified from the user input
+    if(weighted): #pass the y errors as absolute uncertainties so each point is weighted by them
+        ans, cov, info, message, flag = optimize.curve_fit(fitting,xvals,yvals,p0=paramguesses,jac=jacobian,sigma=error,absolute_sigma=True,bounds=bounds,full_output=True)
+    else:
+        ans, cov, info, message, flag = optimize.curve_fit(fitting,xvals,yvals,p0=paramguesses,jac=jacobian,bounds=bounds,full_output=True)
     
-    plt.subplot(212) #add a subplot for residuals
-    y0 = [0]*len(yvals) #create an array of zeroes to draw a line at y=0 across the residual graph
-    #plot the residual values with no line and coloured errorbars with distinct marker
-    plt.errorbar(xvals, residuals, yerr = error, color = mcolour, ecolor = ecolour1, linestyle = 'None', marker = mstyle, markersize = msize)
-    plt.grid(True) #plot a grid
-    plt.plot(xvals,y0) #plot a line through y=0
-    plt.title('Residuals') #add a title of residuals
-    cov2 = cov*(len(yvals)-len(p)-2)/chi2 #calculate a truer covariance matrix of the fitting parameters
-    fittingerror = np.sqrt(np.diag(cov2)) #get a list of the uncertainties on the fitting parameters
-    #check if a gradient ordinate was specified
-    if(gradpoints!='' and power!=1):
-        coordinates = float(gradpoints) #this has already been validated so float it
-        powercoeff = power #store a duplicated of the power to iterate over
-        gradeqn='' #define the gradient equation as an empty string
-        for i in range(0,powercoeff): #loop over the number of terms to calculate the gradient
-            if(powercoeff!=0): #if it is not the intercept value
-                derivativecoeff = float(p[i])*powercoeff #the derivative coefficient is it's original coefficient times its power
-                powercoeff-=1 #the power on the x value is reduced by one
-                if(powercoeff==0): #if it's intercept of the gradient
-                    string = '(%s)' % (derivativecoeff) #make string of new coefficient, no x term is needed
-                else: #if it's not the intercept
-                    string = '(%s*x**%s)' % (derivativecoeff,powercoeff) #add the new coefficient times x to its reduced power to a new string
-                if(powercoeff==power-1): #if this is the first iteration
-                    gradeqn = string #make gradient equation the new string
-                else: #if not the first iteration
-                    gradeqn = gradeqn+'+'+string #add the new string to the existing gradient equation
-            else:
+    results = fitstatistics(yvals, fitting(xvals,*ans), error, cov, weighted) #evaluate the fitted equation once for every point
+    #keep the number of function and jacobian evaluations (one jacobian per iteration) so the cost of different starting guesses can be compared
+    results.update({'mode': 'custom', 'weighted': weighted, 'equation': equation, 'names': list(userfittingparams), 'params': ans, 'nfev': info['nfev'], 'njev': info.get('njev',0)})
+    return results
+
+#read parameter bounds written as low:high for each fitting parameter separated by commas, such as 0:10, -pi:pi
+def parsebounds(text, count):
+    bounds = []
+    for i in text.split(','):
+        limits = i.split(':')
+        if(len(limits)!=2):
+            raise ValueError('Bounds should be written as low:high for each fitting parameter, separated by commas.')
+        try: #allow constants such as pi in the bounds
+            low, high = [float(eval(compile(parseequation(j),'<bound>','eval'),{'__builtins__': {}},dict(equationconstants))) for j in limits]
+        except Exception:
+            raise ValueError('Bounds should be numbers or constants such as pi, written as low:high for each fitting parameter.')
+        if(not low<high):
+            raise ValueError('The low bound of each fitting parameter must be below its high bound.')
+        bounds.append((low,high))
+    if(len(bounds)!=count):
+        raise ValueError('Give one pair of bounds for each fitting parameter.')
+    return bounds
+
+#chi squared of many candidate sets of fitting parameters at once, worked out in blocks of candidates so the (k,N) array of model values stays a manageable size
+def batchchi2(batch, xvals, yvals, error, paramsets):
+    chi2 = np.empty(len(paramsets))
+    block = max(1,4000000//max(len(xvals),1))
+    for i in range(0,len(paramsets),block):
+        residuals = (yvals-batch(xvals,paramsets[i:i+block]))/error
+        chi2[i:i+block] = np.einsum('ij,ij->i',residuals,residuals)
+    chi2[~np.isfinite(chi2)] = np.inf #candidates where the equation cannot be evaluated are never picked
+    return chi2
+
+#polish one starting point of a global fit with curve_fit inside the bounds, a start that fails to converge gives None instead of stopping the search
+def polishstart(arguments, progress=None):
+    xvals, yvals, error, equation, userfittingparams, start, weighted, bounds = arguments
+    try:
+        return customfit(xvals,yvals,error,equation,userfittingparams,start,weighted,bounds,progress)
+    except (RuntimeError, ValueError, np.linalg.LinAlgError):
+        return None
+
+#search for the best fit of a custom law when the guesses may be far off, quasi random Sobol starting points spread across the bounds of each parameter are scored by chi squared in one batched evaluation
+#the best few, along with the guesses and optionally the result of a differential evolution search, are polished with curve_fit across a pool of workers and the fit with the lowest chi squared is kept
+def globalfit(xvals, yvals, error, equation, userfittingparams, paramguesses, bounds, starts=256, polish=8, evolution=False, weighted=False, workers=1, progress=None):
+    compileequation(equation,userfittingparams) #check the names in the equation before the batched evaluation
+    bounds = np.asarray(bounds,dtype=float)
+    lows, highs = bounds[:,0], bounds[:,1]
+    batch = compilebatch(equation,userfittingparams)
+    sampler = qmc.Sobol(d=len(lows),seed=0)
+    candidates = qmc.scale(sampler.random_base2(max(0,int(np.ceil(np.log2(starts))))),lows,highs) #a power of two Sobol points covers the bounds most evenly
+    candidates = np.vstack([np.clip(paramguesses,lows,highs),candidates]) #always try the guesses as well
+    if(evolution): #a differential evolution search scored with the same batched chi squared, polished below rather than by scipy
+        search = optimize.differential_evolution(lambda p: batchchi2(batch,xvals,yvals,error,p.T),bounds,vectorized=True,updating='deferred',polish=False,seed=0,
+                                                 callback=lambda intermediate_result: progress is not None and progress['cancel'].is_set()) #returning true stops the search
+        checkcancel(progress)
+        candidates = np.vstack([search.x,candidates])
+    score = batchchi2(batch,xvals,yvals,error,candidates)
+    order = np.argsort(score,kind='stable')[:polish]
+    arguments = [(xvals,yvals,error,equation,userfittingparams,candidates[i],weighted,(lows,highs)) for i in order]
+    fits = [i for i in poolmap(polishstart,arguments,workers,progress) if i is not None]
+    if(fits==[]):
+        raise RuntimeError('None of the starting points converged to a fit, try wider bounds or more starts.')
+    results = min(fits,key=lambda i: i['chi2']) #keep the best fit by chi squared
+    results.update({'starts': len(candidates), 'polished': len(arguments), 'converged': len(fits)})
+    return results
+
+#invert the normal matrix of a fit whose parameters are a few shared by every dataset and a block belonging to each dataset, without forming the whole matrix
+#corner is the (S,S) part for the shared parameters, border the (D,L,S) parts linking each dataset's own parameters to them and blocks the (D,L,L) parts for each dataset's own parameters
+#only the small blocks and the Schur complement of the shared parameters are inverted, so the cost grows with the number of datasets rather than its cube
+def schurcovariance(corner, border, blocks):
+    inverses = np.linalg.inv(blocks) if blocks.shape[1]>0 else blocks
+    linked = inverses @ border #(D,L,S) solves of each block against its border
+    sharedcov = np.linalg.inv(corner-np.einsum('dls,dlt->st',border,linked)) if corner.shape[0]>0 else corner
+    cross = -linked @ sharedcov #covariance of each dataset's own parameters with the shared ones
+    localcov = inverses - cross @ np.swapaxes(linked,1,2)
+    return sharedcov, cross, localcov
+
+#fit one custom law to many datasets at once, the parameters named in shared take one value across every dataset and the others take their own value in each dataset
+#each dataset's residuals only depend on the shared parameters and its own, so the jacobian is zero outside those blocks and is passed to least_squares as a sparse matrix with a fixed pattern, solved with lsmr so hundreds of datasets stay quick
+#the results hold the shared parameters, and the results of each dataset in the same form as customfit with every parameter in the order of userfittingparams
+def sharedfit(datasets, equation, userfittingparams, paramguesses, shared, weighted=False, progress=None):
+    fitting = compileequation(equation,userfittingparams)
+    jacobian = compilejacobian(equation,userfittingparams)
+    userfittingparams = [str(i).strip() for i in userfittingparams]
+    unknown = set(shared)-set(userfittingparams)
+    if(unknown!=set()):
+        raise ValueError('The shared parameters %s are not fitting parameters of the equation.' % ', '.join(sorted(unknown)))
+    sharedindex = [i for i in range(0,len(userfittingparams)) if userfittingparams[i] in shared]
+    localindex = [i for i in range(0,len(userfittingparams)) if userfittingparams[i] not in shared]
+    S, L, D = len(sharedindex), len(localindex), len(datasets)
+    xsets = [np.asarray(x,dtype=float) for x, y, err in datasets]
+    ysets = [np.asarray(y,dtype=float) for x, y, err in datasets]
+    weights = [1/np.asarray(err,dtype=float) if weighted else np.ones(len(x)) for x, y, err in datasets] #weight each residual by its error as curve_fit does with sigma
+    sizes = [len(x) for x in xsets]
+    paramguesses = np.asarray(paramguesses,dtype=float)
+    start = np.concatenate([paramguesses[sharedindex],np.tile(paramguesses[localindex],D)]) #shared parameters first then the parameters of each dataset in turn
+    def unpack(p): #the parameters of each dataset as a (D,P) array in the order of userfittingparams
+        full = np.empty((D,len(userfittingparams)))
+        full[:,sharedindex] = p[:S]
+        full[:,localindex] = p[S:].reshape(D,L)
+        return full
+    #every row of dataset d has an entry in the shared columns and in its own L columns, so the sparse pattern is fixed and only the values change
+    order = sharedindex+localindex
+    indices = np.concatenate([np.tile(np.concatenate([np.arange(S),S+d*L+np.arange(L)]),sizes[d]) for d in range(0,D)]).astype(np.int64)
+    indptr = np.arange(0,len(indices)+1,S+L)
+    def residuals(p):
+        checkcancel(progress)
+        if(progress is not None):
+            progress['nfev'] += 1
+        full = unpack(p)
+        return np.concatenate([(fitting(xsets[d],*full[d])-ysets[d])*weights[d] for d in range(0,D)])
+    def jacobians(p): #weighted jacobian of each dataset with the columns in shared then own order
+        full = unpack(p)
+        return [jacobian(xsets[d],*full[d])[:,order]*weights[d][:,None] for d in range(0,D)]
+    def sparsejacobian(p):
+        checkcancel(progress)
+        if(progress is not None):
+            progress['njev'] += 1
+        values = np.concatenate([i.ravel() for i in jacobians(p)])
+        return sparse.csr_matrix((values,indices,indptr),shape=(sum(sizes),S+D*L))
+    fit = optimize.least_squares(residuals,start,jac=sparsejacobian,method='trf',tr_solver='lsmr',x_scale='jac')
+    if(fit.status<=0):
+        raise RuntimeError('The shared fit did not converge: %s' % fit.message)
+    
+    #an unweighted fit scales each dataset's part of the normal matrix as customfit would scale that dataset on its own, so with nothing shared each dataset gets the errors of fitting it alone
+    full = unpack(fit.x)
+    fitvals = [fitting(xsets[d],*full[d]) for d in range(0,D)]
+    scales = np.ones(D) if weighted else np.array([unweightedscale(fitvals[d]-ysets[d],datasets[d][2],sizes[d]-S-L) for d in range(0,D)])
+    #the normal matrix splits into the shared corner, a border for each dataset and a block for each dataset's own parameters
+    blockjacobians = jacobians(fit.x)
+    corner = sum(blockjacobians[d][:,:S].T @ blockjacobians[d][:,:S]/scales[d] for d in range(0,D))
+    border = np.array([blockjacobians[d][:,S:].T @ blockjacobians[d][:,:S]/scales[d] for d in range(0,D)]).reshape(D,L,S)
+    blocks = np.array([blockjacobians[d][:,S:].T @ blockjacobians[d][:,S:]/scales[d] for d in range(0,D)]).reshape(D,L,L)
+    try:
+        sharedcov, cross, localcov = schurcovariance(corner,border,blocks)
+    except np.linalg.LinAlgError: #a parameter that does not change the fit has no uncertainty, curve_fit gives inf in the same case
+        sharedcov, cross, localcov = np.full((S,S),np.inf), np.full((D,L,S),np.inf), np.full((D,L,L),np.inf)
+    dof = sum(sizes)-len(start)
+    
+    results = {'mode': 'shared', 'weighted': weighted, 'equation': equation, 'names': [userfittingparams[i] for i in sharedindex], 'params': fit.x[:S], 'errors': np.sqrt(np.diag(sharedcov)),
+               'cov': sharedcov, 'chi2': 0.0, 'dof': dof, 'nfev': fit.nfev, 'njev': fit.njev, 'datasets': []}
+    for d in range(0,D): #covariance of every parameter of this dataset put back in the order of userfittingparams
+        cov = np.empty((S+L,S+L))
+        cov[:S,:S], cov[S:,:S], cov[:S,S:], cov[S:,S:] = sharedcov, cross[d], cross[d].T, localcov[d]
+        cov = cov[np.argsort(order)][:,np.argsort(order)]
+        result = fitstatistics(ysets[d],fitvals[d],datasets[d][2],cov,True) #the covariance is already scaled so is not rescaled again
+        result.update({'mode': 'shared', 'weighted': weighted, 'equation': equation, 'names': list(userfittingparams), 'shared': results['names'], 'params': full[d]})
+        results['chi2'] += result['chi2']
+        results['datasets'].append(result)
+    results['redchi2'] = results['chi2']/dof
+    return results
+
+#fit a model to data with errors in x as well as y by orthogonal distance regression, each x value is allowed to move by a shift that is paid for by its x error
+#the fitting parameters and one shift per point are solved for together by damped gauss newton steps, as in ODRPACK each point's shift only meets the parameters and itself in the normal matrix
+#so the shifts are eliminated point by point and only a small system the size of the parameters is solved each step, whatever the number of points
+#the parameter covariance is the inverse of that reduced normal matrix as schurcovariance gives it, which is the covariance scipy.odr reports, scaled by the reduced chi squared unless weighted
+def odrfit(xvals, yvals, error, xerror, fitting, jacobian, slope, start, weighted=False, progress=None, iterations=200):
+    xvals, yvals = np.asarray(xvals,dtype=float), np.asarray(yvals,dtype=float)
+    yweight, xweight = 1/np.asarray(error,dtype=float), 1/np.asarray(xerror,dtype=float)
+    if(not (np.all(np.isfinite(yweight)) and np.all(np.isfinite(xweight)))):
+        raise ValueError('Fitting with x errors needs every x and y error to be above zero.')
+    def residuals(params, shifts): #weighted distance of each point from the curve in y at its shifted x, and how far it was shifted
+        checkcancel(progress)
+        if(progress is not None):
+            progress['nfev'] += 1
+        with np.errstate(all='ignore'):
+            return (fitting(xvals+shifts,*params)-yvals)*yweight, shifts*xweight
+    def parts(params, shifts): #weighted derivatives of each point's y residual with respect to the parameters and to its shift
+        checkcancel(progress)
+        if(progress is not None):
+            progress['njev'] += 1
+        with np.errstate(all='ignore'):
+            return np.asarray(jacobian(xvals+shifts,*params))*yweight[:,None], np.asarray(slope(xvals+shifts,*params))*yweight
+    params, shifts = np.asarray(start,dtype=float), np.zeros(len(xvals))
+    yresidual, xresidual = residuals(params,shifts)
+    cost = np.sum(yresidual**2)+np.sum(xresidual**2)
+    if(not np.isfinite(cost)):
+        raise ValueError('The equation does not give real values over the data with the guesses provided.')
+    damping, nfev, njev = 1e-3, 1, 0
+    for iteration in range(0,iterations):
+        byparams, byshift = parts(params,shifts)
+        njev += 1
+        normal, gradient = byparams.T @ byparams, byparams.T @ yresidual
+        shiftnormal, shiftgradient = byshift**2+xweight**2, byshift*yresidual+xweight*xresidual
+        while(True): #raise the damping until the step lowers chi squared
+            shiftdamped = shiftnormal*(1+damping)
+            reduced = normal+damping*np.diag(np.diag(normal))-byparams.T @ (byparams*(byshift**2/shiftdamped)[:,None])
+            try:
+                step = -np.linalg.solve(reduced,gradient-byparams.T @ (byshift*shiftgradient/shiftdamped))
+            except np.linalg.LinAlgError:
+                step = np.full(len(params),np.nan)
+            shiftstep = -(shiftgradient+byshift*(byparams @ step))/shiftdamped
+            newyresidual, newxresidual = residuals(params+step,shifts+shiftstep)
+            nfev += 1
+            newcost = np.sum(newyresidual**2)+np.sum(newxresidual**2)
+            if(newcost<=cost or damping>1e10): #accept the step, or stop trying once the damping has made it vanishingly small
+                break
+            damping *= 10
+        if(not newcost<=cost): #no step downhill from here so this is the minimum
+            break
+        params, shifts, yresidual, xresidual = params+step, shifts+shiftstep, newyresidual, newxresidual
+        converged = cost-newcost<=1e-10*cost or np.all(np.abs(step)<=1e-10*np.maximum(np.abs(params),1e-10)) #the step test stops a fit through every point, whose chi squared is only rounding error
+        cost = newcost
+        damping = max(damping/10,1e-12)
+        if(converged):
+            break
+    else:
+        raise RuntimeError('The fit with x errors did not converge within %d iterations.' % iterations)
+    
+    byparams, byshift = parts(params,shifts)
+    try: #each point's shift is a block of one, linked to the parameters through its slope
+        cov = schurcovariance(byparams.T @ byparams,(byshift[:,None]*byparams)[:,None,:],(byshift**2+xweight**2)[:,None,None])[0]
+    except np.linalg.LinAlgError:
+        cov = np.full((len(params),len(params)),np.inf)
+    chi2data = yresidual**2+xresidual**2 #each point's contribution includes how far its x value had to move
+    dof = len(xvals)-len(params)
+    chi2 = np.sum(chi2data)
+    fitcov = cov if weighted else cov*chi2/dof #scaled by the reduced chi squared as curve_fit does without absolute errors
+    if(not weighted): #then rescaled as fitstatistics does for the other unweighted fits, so with x errors near zero the errors match those fits
+        cov = fitcov*(dof-2)/chi2
+    fitvals = fitting(xvals,*params)
+    return {'errors': np.sqrt(np.diag(cov)), 'cov': cov, 'fitcov': fitcov, 'chi2': chi2, 'chi2data': chi2data, 'dof': dof, 'redchi2': chi2/dof, 'fitvals': fitvals, 'residuals': yvals-fitvals,
+            'params': params, 'xshifts': shifts, 'odr': True, 'weighted': weighted, 'nfev': nfev, 'njev': njev}
+
+#fit a custom law equation using the x errors as well as the y errors, starting from the parameter guesses, results as customfit with odr set
+def customodr(xvals, yvals, error, xerror, equation, userfittingparams, paramguesses, weighted=False, progress=None):
+    results = odrfit(xvals,yvals,error,xerror,compileequation(equation,userfittingparams),compilejacobian(equation,userfittingparams),compileslope(equation,userfittingparams),paramguesses,weighted,progress)
+    results.update({'mode': 'custom', 'equation': equation, 'names': list(userfittingparams)})
+    return results
+
+#fit a polynomial using the x errors as well as the y errors, starting from the fit that treats x as exact, results as polynomialfit with odr set
+def polynomialodr(xvals, yvals, error, xerror, power, weighted=False, progress=None):
+    power = int(power)
+    start = polynomialfit(xvals,yvals,error,power,True)['params']
+    results = odrfit(xvals,yvals,error,xerror,lambda x,*p: np.polyval(p,x),lambda x,*p: np.vander(x,power+1),lambda x,*p: np.polyval(np.polyder(p),x),start,weighted,progress)
+    results.update({'mode': 'polynomial', 'power': power, 'names': polynomialnames(power)})
+    return results
+
+#weight each point carries at the end of a fit with a robust loss, the derivative of the loss at the point's squared residual over the scale, as least_squares applies it
+robustweights = {'linear': lambda z: np.ones_like(z), 'soft_l1': lambda z: 1/np.sqrt(1+z), 'huber': lambda z: 1/np.sqrt(np.maximum(z,1)), 'cauchy': lambda z: 1/(1+z)}
+
+#spread of residuals from the median absolute deviation, which a few outliers barely move, scaled to match the standard deviation of normally distributed residuals
+def robustscale(residuals):
+    return 1.4826*np.median(np.abs(residuals-np.median(residuals))) or 1.0
+
+#fit a model with least_squares using a loss that stops large residuals dominating, soft_l1, huber or cauchy, then optionally clip points more than clip sigma from the fit and refit until no more are clipped
+#residuals are in units of the y errors when weighted, otherwise in units of their own robust spread, so the loss turns robust and points are clipped at a sensible size either way
+#the covariance uses the weight the loss gave each point, the clipped points and the number of fits needed are returned with the statistics of the points kept
+def robustfit(xvals, yvals, error, fitting, jacobian, start, loss='soft_l1', clip=0, weighted=False, progress=None, iterations=10):
+    xvals, yvals, error = np.asarray(xvals,dtype=float), np.asarray(yvals,dtype=float), np.asarray(error,dtype=float)
+    if(progress is not None): #count the evaluations for the progress display and stop as soon as the fit is cancelled
+        fitting, jacobian = monitorfit(fitting,progress,'nfev'), monitorfit(jacobian,progress,'njev')
+    weight = 1/error if weighted else np.ones(len(xvals))
+    kept = np.ones(len(xvals),dtype=bool)
+    params = np.asarray(start,dtype=float)
+    nfev, njev = 0, 0
+    settled = True
+    for iteration in range(1,iterations+1):
+        x, y, w = xvals[kept], yvals[kept], weight[kept]
+        scale = 1.0 if weighted else robustscale(fitting(x,*params)-y)
+        fit = optimize.least_squares(lambda p: (fitting(x,*p)-y)*w,params,jac=lambda p: jacobian(x,*p)*w[:,None],loss=loss,f_scale=scale)
+        params, nfev, njev = fit.x, nfev+fit.nfev, njev+(fit.njev or 0)
+        if(clip<=0):
+            break
+        residuals = (fitting(xvals,*params)-yvals)*weight
+        newkept = np.abs(residuals)<=clip*(1.0 if weighted else robustscale(residuals[kept])) #clip every point in one comparison, including putting back any that now fit
+        if(np.array_equal(newkept,kept)):
+            break
+        if(iteration==iterations): #out of fits while points are still changing, so keep the points the parameters were fitted to
+            settled = False
+            break
+        kept = newkept
+        if(np.sum(kept)<=len(params)):
+            raise RuntimeError('Sigma clipping left too few points to fit, try a larger clipping threshold.')
+    
+    x, y, w = xvals[kept], yvals[kept], weight[kept]
+    residuals = (fitting(x,*params)-y)*w
+    pointweight = robustweights[loss]((residuals/scale)**2)
+    jac = jacobian(x,*params)*w[:,None]
+    try:
+        cov = np.linalg.inv(jac.T @ (jac*pointweight[:,None]))
+    except np.linalg.LinAlgError:
+        cov = np.full((len(params),len(params)),np.inf)
+    if(not weighted): #scaled as the other unweighted fits are, the robust scale only changes how much each point counts
+        cov = cov*unweightedscale(residuals,error[kept],np.sum(kept)-len(params))
+    results = fitstatistics(y,fitting(x,*params),error[kept],cov,True) #already scaled so is not rescaled again
+    fitvals = fitting(xvals,*params) #the fit and residuals of every point, clipped or not, for drawing
+    results.update({'fitvals': fitvals, 'residuals': yvals-fitvals, 'params': params, 'weighted': weighted, 'loss': loss, 'clip': clip, 'clipped': ~kept, 'iterations': iteration, 'settled': settled, 'nfev': nfev, 'njev': njev})
+    return results
+
+#robust fit of a polynomial or custom law as described by a spec dictionary, polynomials start from the ordinary fit and custom laws from the guesses
+def robustspecfit(xvals, yvals, error, spec):
+    loss, clip, weighted, progress = spec.get('loss','linear'), spec.get('clip',0), spec.get('weighted',False), spec.get('progress')
+    if(spec.get('equation') is not None):
+        equation, userfittingparams = spec['equation'], spec['params']
+        results = robustfit(xvals,yvals,error,compileequation(equation,userfittingparams),compilejacobian(equation,userfittingparams),spec['guesses'],loss,clip,weighted,progress)
+        results.update({'mode': 'custom', 'equation': equation, 'names': list(userfittingparams)})
+        return results
+    power = int(spec['power'])
+    start = polynomialfit(xvals,yvals,error,power,weighted)['params']
+    results = robustfit(xvals,yvals,error,lambda x,*p: np.polyval(p,x),lambda x,*p: np.vander(x,power+1),start,loss,clip,weighted,progress)
+    results.update({'mode': 'polynomial', 'power': power, 'names': polynomialnames(power)})
+    return results
+
+#describe the robust loss and clipping of a fit for display, such as Soft L1 Loss, 3 Points Clipped Beyond 3 Sigma In 2 Fits
+def robustsummary(results):
+    text = '%s Loss' % {'linear': 'Least Squares', 'soft_l1': 'Soft L1', 'huber': 'Huber', 'cauchy': 'Cauchy'}[results['loss']]
+    if(results['clip']>0):
+        text += ', %d Points Clipped Beyond %g Sigma' % (np.sum(results['clipped']),results['clip'])
+    fits = '1 Fit' if results['iterations']==1 else '%d Fits' % results['iterations']
+    if(not results.get('settled',True)): #the clipped points were still changing when the fits ran out
+        return text+', Stopped After %s Before Clipping Settled' % fits
+    return text+', '+fits
+
+#refit a polynomial to many resamples of the data at once, a resample drawn with replacement only changes how many times each point counts
+#so the normal equations of a whole block of resamples come from one matrix product of the counts with the products of the columns, then are solved together
+def bootstrappolynomial(xvals, yvals, error, power, weighted, resamples, rng, progress=None):
+    order = power+1
+    n = len(xvals)
+    centre = (np.max(xvals)+np.min(xvals))/2
+    scale = (np.max(xvals)-np.min(xvals))/2 or 1.0
+    vander = np.vander((xvals-centre)/scale,order) #centred and scaled x keeps the normal equations well conditioned
+    weights = 1/np.asarray(error)**2 if weighted else np.ones(n)
+    products = (vander[:,:,None]*vander[:,None,:]).reshape(n,order*order)*weights[:,None]
+    moments = vander*(yvals*weights)[:,None]
+    samples = np.empty((resamples,order))
+    block = max(1,4000000//n) #keep each block of counts to a manageable size
+    for i in range(0,resamples,block):
+        checkcancel(progress)
+        k = min(block,resamples-i)
+        rows = rng.integers(0,n,(k,n)) #draw points with replacement for each resample
+        counts = np.bincount((rows+n*np.arange(k)[:,None]).ravel(),minlength=k*n).reshape(k,n).astype(float) #times each point was drawn in each resample
+        ata = (counts @ products).reshape(k,order,order)
+        aty = counts @ moments
+        singular = np.count_nonzero(counts,axis=1)<=power #resamples with too few distinct points cannot be fitted
+        ata[singular] = np.eye(order)
+        samples[i:i+k] = np.linalg.solve(ata,aty[...,None])[...,0]
+        samples[i:i+k][singular] = np.nan
+    return samples @ powertransform(power,centre,scale).T
+
+#refit a custom law to a chunk of resamples of the data in one worker, each fit starts from the fit to the full data as the resampled optimums are close to it
+def bootstrapchunk(arguments, progress=None):
+    xvals, yvals, error, equation, userfittingparams, start, weighted, bounds, resamples, seed = arguments
+    fitting = compileequation(equation,userfittingparams)
+    jacobian = compilejacobian(equation,userfittingparams)
+    rng = np.random.default_rng(seed)
+    samples = np.full((resamples,len(start)),np.nan) #resamples that fail to converge are left as nan
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore') #resamples with a poorly defined covariance would warn every time
+        for i in range(0,resamples):
+            checkcancel(progress)
+            rows = rng.integers(0,len(xvals),len(xvals))
+            try:
+                if(weighted):
+                    samples[i] = optimize.curve_fit(fitting,xvals[rows],yvals[rows],p0=start,jac=jacobian,sigma=error[rows],absolute_sigma=True,bounds=bounds)[0]
+                else:
+                    samples[i] = optimize.curve_fit(fitting,xvals[rows],yvals[rows],p0=start,jac=jacobian,bounds=bounds)[0]
+            except (RuntimeError, ValueError, np.linalg.LinAlgError):
                 pass
+    return samples
 
-        gradeqnsubbed = gradeqn.replace('x',str(coordinates)) #when full derivative equation found replace x with the x ordinate the gradient is wanted for
-        gradval = eval(gradeqnsubbed) #evaluate the gradient string to get a value
+#bootstrap the uncertainty of a fit by refitting it to resamples of the data drawn with replacement, giving percentile confidence intervals and the correlation matrix of the parameters
+#polynomial resamples are solved together in stacked blocks, custom law resamples are split into chunks of warm started fits spread across a pool of workers
+#bounds are the low, high pairs a custom law was fitted within, if any, so the resamples are refitted within them too
+def bootstrapfit(results, xvals, yvals, error, resamples=1000, level=95, workers=1, seed=0, progress=None, bounds=None):
+    xvals, yvals, error = np.asarray(xvals,dtype=float), np.asarray(yvals,dtype=float), np.asarray(error,dtype=float)
+    if(results['mode']=='polynomial'):
+        samples = bootstrappolynomial(xvals,yvals,error,results['power'],results['weighted'],resamples,np.random.default_rng(seed),progress)
+    else:
+        sizes = [min(50,resamples-i) for i in range(0,resamples,50)] #fixed chunks so the samples do not depend on the number of workers
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        bounds = (-np.inf,np.inf) if bounds is None else tuple(np.asarray(bounds,dtype=float).T)
+        arguments = [(xvals,yvals,error,results['equation'],results['names'],np.asarray(results['params']),results['weighted'],bounds,sizes[i],seeds[i]) for i in range(0,len(sizes))]
+        samples = np.vstack(poolmap(bootstrapchunk,arguments,workers,progress))
+    good = samples[np.all(np.isfinite(samples),axis=1)]
+    if(len(good)<2):
+        raise RuntimeError('Too few resamples could be fitted to bootstrap the uncertainties.')
+    tail = (100-level)/2
+    return {'samples': good, 'level': level, 'intervals': np.percentile(good,[tail,100-tail],axis=0).T, 'median': np.median(good,axis=0),
+            'errors': np.std(good,axis=0,ddof=1), 'correlation': np.corrcoef(good,rowvar=False), 'resamples': len(good), 'failed': len(samples)-len(good)}
 
-        gradienterror = np.sqrt(np.sum(fittingerror[:-1]**2)) #work out the  uncertainty on the gradient value
-    
-    else: #if gradient not wanted/needed
-        pass #do nothing
+#find the gradient of a fit at an array of x ordinates in one go, with uncertainties propagated from the full covariance matrix of the fitting parameters
+def fitgradient(results, xords):
+    xords = np.atleast_1d(np.asarray(xords,dtype=float))
+    if(results.get('basis') is not None): #differentiate in the basis the polynomial was fitted in
+        series = polynomialbases[results['basis']][0]
+        gradvals = series(results['basisparams'],results['domain']).deriv()(xords)
+        jac = np.stack([series.basis(i,results['domain']).deriv()(xords) for i in range(0,len(results['basisparams']))],axis=1)
+        gradienterror = np.sqrt(np.einsum('ij,jk,ik->i',jac,results['basiscov'],jac))
+        return {'x': xords, 'values': gradvals, 'errors': gradienterror}
+    if(results['mode']=='polynomial'):
+        p = results['params']
+        power = len(p)-1
+        gradvals = np.polyval(np.polyder(p),xords) #differentiate the polynomial coefficients directly
+        jac = np.zeros((len(xords),len(p))) #derivative of the gradient with respect to each coefficient, highest power first
+        for i in range(0,power):
+            jac[:,i] = (power-i)*xords**(power-i-1)
+    else:
+        gradvals, jac = compilegradient(results['equation'],results['names'])(xords,*results['params'])
+    gradienterror = np.sqrt(np.einsum('ij,jk,ik->i',jac,results['cov'],jac)) #propagate the covariance, including the correlations between parameters
+    return {'x': xords, 'values': gradvals, 'errors': gradienterror}
+
+#above this many points graphs are drawn decimated, with error bars shown as a shaded band and the fit drawn on a fixed grid of lodpoints x values
+lodthreshold = 5000
+lodpoints = 2000
+
+#evaluate a fit at any x values from its dictionary of results
+def fitcurve(results, xvals):
+    if(results.get('basis') is not None): #evaluate in the basis the polynomial was fitted in
+        return polynomialbases[results['basis']][0](results['basisparams'],results['domain'])(xvals)
+    if(results['mode']=='polynomial'):
+        return np.polyval(results['params'],xvals)
+    return compileequation(results['equation'],results['names'])(xvals,*results['params'])
+
+#directory and maximum number of entries of the on disk cache of fit results, and the number of hits and misses since the program started
+cachedirectory = os.environ.get('GENERALPLOTTER_CACHE',os.path.join(os.path.expanduser('~'),'.cache','GeneralPlotter'))
+cachesize = 256
+cachestats = {'hits': 0, 'misses': 0}
+
+#fit the data as described by a spec dictionary holding either the polynomial power or the custom equation, parameters and guesses, and whether to weight the fit
+def specfit(xvals, yvals, error, spec):
+    if(spec.get('odr')): #fit with the x errors held in the spec as well as the y errors
+        if(spec.get('equation') is not None):
+            return customodr(xvals,yvals,error,spec['xerror'],spec['equation'],spec['params'],spec['guesses'],spec.get('weighted',False),spec.get('progress'))
+        return polynomialodr(xvals,yvals,error,spec['xerror'],spec['power'],spec.get('weighted',False),spec.get('progress'))
+    if(spec.get('loss','linear')!='linear' or spec.get('clip',0)>0): #fit that resists outliers
+        return robustspecfit(xvals,yvals,error,spec)
+    if(spec.get('bounds') is not None): #custom law fit searching the whole of the bounds rather than starting only from the guesses
+        return globalfit(xvals,yvals,error,spec['equation'],spec['params'],spec['guesses'],spec['bounds'],spec.get('starts',256),evolution=spec.get('evolution',False),weighted=spec.get('weighted',False),workers=spec.get('fitworkers',1),progress=spec.get('progress'))
+    if(spec.get('equation') is not None): #custom law fit
+        return customfit(xvals,yvals,error,spec['equation'],spec['params'],spec['guesses'],spec.get('weighted',False),progress=spec.get('progress'))
+    if(spec.get('select')): #try every power up to the one given and keep the best
+        return selectpolynomial(xvals,yvals,error,spec['power'],spec.get('weighted',False))
+    return polynomialfit(xvals,yvals,error,spec['power'],spec.get('weighted',False),spec.get('basis','power'))
+
+#hash the values of the data columns given, so a fit can be traced back to exactly the data it was made from whatever the file was called
+#columns are hashed a chunk at a time so a large memory mapped column is never copied whole, the hash is the same as hashing each column in one go
+def datahash(*columns, chunkpoints=1000000):
+    digest = hashlib.sha256()
+    for column in columns:
+        for i in range(0,len(column),chunkpoints):
+            digest.update(memoryview(np.ascontiguousarray(column[i:i+chunkpoints],dtype=np.float64)))
+    return digest.hexdigest()
+
+#key a fit by a hash of the data values and of everything in the spec that changes the fit, labels and styling are left out so changing them reuses the fit
+def cachekey(xvals, yvals, error, spec):
+    digest = hashlib.sha256(datahash(xvals,yvals,error).encode())
+    fitspec = {'power': spec.get('power'), 'equation': spec.get('equation'), 'params': spec.get('params'), 'guesses': spec.get('guesses'), 'weighted': bool(spec.get('weighted',False)),
+               'bounds': spec.get('bounds'), 'starts': spec.get('starts',256), 'evolution': bool(spec.get('evolution',False)), 'select': bool(spec.get('select',False)), 'basis': spec.get('basis','power')}
+    digest.update(json.dumps(fitspec,sort_keys=True).encode())
+    return digest.hexdigest()
+
+#fit the data as specfit does but reuse the coefficients and covariance from the on disk cache if the same data has been fitted the same way before
+#only the residuals and chi squared are worked out again on a hit, which needs one evaluation of the fit, least recently used entries are removed once the cache is full
+def cachedfit(xvals, yvals, error, spec):
+    if(spec.get('odr') or spec.get('loss','linear')!='linear' or spec.get('clip',0)>0): #a fit with x errors finds a shift for every point and a robust fit marks the clipped points, so they are always fitted
+        results = specfit(xvals,yvals,error,spec)
+        results['cached'] = False
+        return results
+    key = cachekey(xvals,yvals,error,spec)
+    path = os.path.join(cachedirectory,key+'.npz')
+    try:
+        with np.load(path) as entry:
+            results = json.loads(str(entry['info']))
+            results.update({'params': entry['params'], 'fitcov': entry['fitcov']})
+        os.utime(path) #mark the entry as recently used
+    except (OSError, ValueError, KeyError): #not in the cache or the entry cannot be read, so fit it
+        cachestats['misses'] += 1
+        results = specfit(xvals,yvals,error,spec)
+        info = {i: np.asarray(results[i]).tolist() if isinstance(results[i],(np.ndarray,np.generic)) else results[i] for i in ('mode','power','weighted','equation','names','basis','domain','basisparams','basiscov',
+                'nfev','njev','starts','polished','converged') if i in results} #the evaluations and starting points the fit took are kept so a hit reports how it was made
+        if('selection' in results): #the comparison of polynomial powers is kept as lists
+            info['selection'] = {i: np.asarray(j).tolist() for i, j in results['selection'].items()}
+        try:
+            os.makedirs(cachedirectory,exist_ok=True)
+            temppath = path+'.%d.tmp' % os.getpid()
+            with open(temppath,'wb') as file: #write then rename so another process never reads half an entry
+                np.savez(file,params=results['params'],fitcov=results['fitcov'],cov=results['cov'],chi2=results['chi2'],info=json.dumps(info))
+            os.replace(temppath,path)
+            prunecache()
+        except OSError: #the cache is only a speed up so a fit still works if it cannot be written
+            pass
+        results['cached'] = False
+        return results
+    cachestats['hits'] += 1
+    results.update(fitstatistics(yvals,fitcurve(results,xvals),error,results['fitcov'],results['weighted']))
+    results['cached'] = True
+    return results
+
+#remove the least recently used entries once there are more than cachesize of them
+def prunecache():
+    entries = [os.path.join(cachedirectory,i) for i in os.listdir(cachedirectory) if i.endswith('.npz')]
+    if(len(entries)>cachesize):
+        entries.sort(key=lambda i: os.path.getmtime(i))
+        for path in entries[:len(entries)-cachesize]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+#report the hits and misses of the fit cache along with where it is and how many entries it holds
+def cacheinfo():
+    try:
+        entries = sum(i.endswith('.npz') for i in os.listdir(cachedirectory))
+    except OSError:
+        entries = 0
+    return {'hits': cachestats['hits'], 'misses': cachestats['misses'], 'entries': entries, 'size': cachesize, 'directory': cachedirectory}
+
+#put each point into one of a number of equal width x bins, one per pixel column, returning the bin of every point and the x value at the centre of each bin
+def xbins(xvals, bins, xmin, xmax):
+    width = (xmax-xmin)/bins or 1.0
+    binindex = np.clip(((xvals-xmin)/width).astype(np.int64),0,bins-1)
+    return binindex, xmin+(np.arange(bins)+0.5)*width
+
+#pick the points with the lowest and highest y value in each x bin, so a decimated plot keeps every peak and trough a full plot would show
+def minmaxdecimate(xvals, yvals, bins=lodpoints):
+    if(len(xvals)==0):
+        return np.empty(0,dtype=np.int64)
+    binindex, centres = xbins(xvals,bins,np.min(xvals),np.max(xvals))
+    if(np.all(binindex[1:]>=binindex[:-1])): #data already in x order needs no sorting
+        order = np.arange(len(binindex))
+    else:
+        order = np.argsort(binindex,kind='stable')
+    starts = np.concatenate([[0],np.flatnonzero(np.diff(binindex[order]))+1]) #where each filled bin starts in the sorted points
+    binof = np.repeat(np.arange(len(starts)),np.diff(np.append(starts,len(order)))) #which filled bin each sorted point is in
+    ysorted = yvals[order]
+    keep = []
+    for extreme in (np.minimum,np.maximum): #first point in each bin that reaches the bin's lowest then highest y value
+        hits = np.flatnonzero(ysorted==extreme.reduceat(ysorted,starts)[binof])
+        keep.append(hits[np.unique(binof[hits],return_index=True)[1]])
+    keep = np.unique(order[np.concatenate(keep)])
+    return keep[np.argsort(xvals[keep],kind='stable')]
+
+#draw decimated data on an axis, the minimum and maximum points of each x bin as markers with the error bars merged into a shaded band, redrawn from the full data whenever the x range is zoomed
+#returns the artists and data in a dict so a later plot can swap in new data without connecting another zoom callback
+def drawdecimated(ax, xvals, yvals, error, mstyle, mcolour, ecolour1, msize):
+    markers, = ax.plot([],[],color = mcolour, linestyle = 'None', marker = mstyle, markersize = msize)
+    drawn = {'markers': markers, 'band': None, 'colour': ecolour1}
+    def redraw(lower, upper):
+        xvals, yvals, error = drawn['data']
+        inview = (xvals>=lower) & (xvals<=upper)
+        x, y, e = xvals[inview], yvals[inview], error[inview]
+        keep = minmaxdecimate(x,y)
+        markers.set_data(x[keep],y[keep])
+        if(drawn['band'] is not None):
+            drawn['band'].remove()
+        if(len(x)!=0): #envelope of the error bars in each bin
+            binindex, centres = xbins(x,lodpoints,lower,upper)
+            bandlow = np.full(lodpoints,np.inf)
+            bandhigh = np.full(lodpoints,-np.inf)
+            np.minimum.at(bandlow,binindex,y-e)
+            np.maximum.at(bandhigh,binindex,y+e)
+            filled = np.isfinite(bandlow) #leave gaps where a bin has no points
+            drawn['band'] = ax.fill_between(centres[filled],bandlow[filled],bandhigh[filled],color = drawn['colour'],alpha = 0.3,linewidth = 0,step = 'mid')
+        else:
+            drawn['band'] = None
+    def zoomed(ax):
+        xmin, xmax = drawn['range']
+        lower, upper = max(ax.get_xlim()[0],xmin), min(ax.get_xlim()[1],xmax) #only the part of the range that has data matters
+        if([lower,upper]==drawn['shown']): #ignore calls where the data in view has not changed, such as the margins being adjusted
+            return
+        drawn['shown'] = [lower,upper]
+        redraw(lower,upper)
+    drawn['redraw'] = redraw
+    updatedecimated(drawn, xvals, yvals, error, mstyle, mcolour, ecolour1, msize)
+    ax.callbacks.connect('xlim_changed',zoomed) #the full data stays available for zooming in
+    return drawn
+
+#swap new data and styling into the artists made by drawdecimated and draw the full range of it
+def updatedecimated(drawn, xvals, yvals, error, mstyle, mcolour, ecolour1, msize):
+    drawn['data'] = (np.asarray(xvals), np.asarray(yvals), np.asarray(error))
+    drawn['range'] = [np.min(xvals),np.max(xvals)]
+    drawn['shown'] = list(drawn['range'])
+    drawn['colour'] = ecolour1
+    drawn['markers'].set(color = mcolour, marker = mstyle, markersize = msize)
+    drawn['redraw'](*drawn['shown'])
+
+#the two ends of every error bar as line segments, in the form a LineCollection takes
+def errorsegments(xvals, yvals, error):
+    xvals, yvals, error = np.asarray(xvals,dtype=float), np.asarray(yvals,dtype=float), np.asarray(error,dtype=float)
+    return np.stack([np.column_stack([xvals,yvals-error]),np.column_stack([xvals,yvals+error])],axis=1)
+
+#draw points with error bars on an axis, or move the ones drawn before to the new data when they are passed in
+def drawpoints(ax, drawn, xvals, yvals, error, mstyle, mcolour, ecolour1, msize, decimate):
+    if(decimate):
+        if(drawn is None):
+            return drawdecimated(ax, xvals, yvals, error, mstyle, mcolour, ecolour1, msize)
+        updatedecimated(drawn, xvals, yvals, error, mstyle, mcolour, ecolour1, msize)
+        return drawn
+    if(drawn is None):
+        return ax.errorbar(xvals, yvals, yerr = error, color = mcolour, ecolor = ecolour1, linestyle = 'None', marker = mstyle, markersize = msize)
+    points, caps, (bars,) = drawn #the errorbar container holds the marker line and the collection of bars
+    points.set_data(xvals,yvals)
+    points.set(color = mcolour, marker = mstyle, markersize = msize)
+    bars.set_segments(errorsegments(xvals,yvals,error))
+    bars.set_color(ecolour1)
+    return drawn
+
+#the corners of what drawpoints drew for the error bars, which the view has to take in so none of the bars are cut off
+def errorlimits(drawn, decimate):
+    if(decimate):
+        if(drawn['band'] is None):
+            return np.empty((0,2))
+        return np.concatenate([path.vertices for path in drawn['band'].get_paths()])
+    points, caps, (bars,) = drawn
+    return np.concatenate(bars.get_segments())
+
+#draw the data with its fit and the residuals as two subplots on the figure passed in
+#large datasets are drawn decimated with the fit evaluated on a fixed grid so the number of points drawn does not grow with the data
+#a figure that has been drawn on before keeps its axes and artists and has the new data swapped into them, so plotting again and again does not build up memory
+def drawfit(fig, xvals, yvals, error, results, xtitle, ytitle, plottitle, mstyle, mcolour, ecolour1, lstyle, msize):
+    decimate = len(xvals)>lodthreshold
+    drawn = getattr(fig,'fitartists',None)
+    if(drawn is None or drawn['decimate']!=decimate or len(fig.axes)!=2): #nothing to reuse so start from an empty figure
+        fig.clf()
+        drawn = {'decimate': decimate, 'axes': (fig.add_subplot(211),fig.add_subplot(212)), 'points': None, 'residuals': None}
+        for ax in drawn['axes']:
+            ax.grid(True) #add a grid
+        fig.fitartists = drawn
+    ax1, ax2 = drawn['axes']
+    if(decimate): #plot the fitting line on an evenly spaced grid across the data
+        xfit = np.linspace(np.min(xvals),np.max(xvals),lodpoints)
+        yfit = fitcurve(results, xfit)
+        xzero = [np.min(xvals),np.max(xvals)]
+    else: #plot the calulated fitting line over the data
+        xfit, yfit = xvals, results['fitvals']
+        xzero = xvals
+    
+    #plot the real data values with error bars and no line with set marker size and colours, then the fitting line over them
+    drawn['points'] = drawpoints(ax1, drawn['points'], xvals, yvals, error, mstyle, mcolour, ecolour1, msize, decimate)
+    if('fitline' not in drawn):
+        drawn['fitline'], = ax1.plot(xfit, yfit, linestyle = lstyle)
+    else:
+        drawn['fitline'].set_data(xfit, yfit)
+        drawn['fitline'].set_linestyle(lstyle)
+    ax1.set_xlabel(xtitle) #add an x label to the graph from the user input
+    ax1.set_ylabel(ytitle) # add a y label to the graph from the user input
+    ax1.set_title(plottitle) #add a title to the graph from the user input
+    
+    #plot the residual values with no line and coloured errorbars with distinct marker and a line through y=0
+    drawn['residuals'] = drawpoints(ax2, drawn['residuals'], xvals, results['residuals'], error, mstyle, mcolour, ecolour1, msize, decimate)
+    if('zeroline' not in drawn):
+        drawn['zeroline'], = ax2.plot(xzero, np.zeros(len(xzero)))
+        drawn['clippedline'], = ax2.plot([], [], color = 'black', linestyle = 'None', marker = 'o', markerfacecolor = 'none') #ring the points a robust fit clipped
+    else:
+        drawn['zeroline'].set_data(xzero, np.zeros(len(xzero)))
+    clipped = results.get('clipped',np.zeros(len(xvals),dtype=bool))
+    drawn['clippedline'].set_data(np.asarray(xvals)[clipped], np.asarray(results['residuals'])[clipped])
+    drawn['clippedline'].set_markersize(2*msize)
+    ax2.set_title('Residuals') #add a title of residuals
+    for ax, points in zip(drawn['axes'],(drawn['points'],drawn['residuals'])): #fit the view to the new data
+        ax.relim() #this only finds the lines, so the ends of the error bars or the band are added to the limits by hand
+        ax.update_datalim(errorlimits(points,decimate))
+        ax.autoscale_view()
+    fig.tight_layout() #stop labels from overlapping
+    return fig
+
+#the figure the window plots on, made on the first plot and reused for every plot after it unless it has been closed
+def guifigure():
+    if(plt.fignum_exists(1)):
+        return plt.figure(1)
+    return plt.figure(1,figsize=(9,6))
+
+#plot a polynomial fit and display its fitting parameters, along with any gradients, comparison of powers and bootstrap intervals that were worked out with it
+def powerplot(results, xtitle, ytitle, plottitle, outfilepath, mstyle, mcolour, ecolour1, lstyle, msize):
+    xvals, yvals, error = results['data']
+    p = results['params']
+    fittingerror = results['errors']
+    redchi2 = results['redchi2']
+    fig1 = guifigure() #figure 1, made the first time and drawn over after that
+    drawfit(fig1, xvals, yvals, error, results, xtitle, ytitle, plottitle, mstyle, mcolour, ecolour1, lstyle, msize)
     
-    powercoeff = power #reset powercoeff for iterating
     #add label informing of fitting parameters to scrollable frame
     resultslabel = Label(subframe,text='Fitting Parameters:',relief='solid').grid(row=0,column=0,sticky='nsew') 
     #add label of the reduced chi squared value to the scrollable window
     chilabel = Label(subframe, text=('Reduced Chi Squared: %8.6f' % redchi2),relief='solid').grid(row=1,column=0,sticky='nsew')
     labelrow = 2 #set variable to define which row new parameters need to be displayed on
-    if(powercoeff==1): #if the graph is linear there will only be a gradient and y intercept so display those with uncertainty
-        gradlabel = Label(subframe,text=('m: %.5e ± %.5e' % (p[0],fittingerror[0])),relief='solid').grid(row=2,column=0,sticky='nsew')
-        clabel = Label(subframe,text=('c: %.5e ± %.5e' % (p[1],fittingerror[1])),relief='solid').grid(row=3,column=0,sticky='nsew')
-    else: #if it is higher order than linear
-        for i in range(0,len(p)): #loop over the number of coefficients
-            if(powercoeff!=0): #special case conditions for tidier display, if not down to 0th order ie y intercept
-                if(powercoeff==1): #if it is x^1 just display as x with its coefficients and uncertainty
-                    Label(subframe,text=('x Coefficient: %.5e ± %.5e' % (p[i],fittingerror[i])),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
-                else: #if it is not the x coefficient diplay it as x^powercoeff with its coefficient and uncertainty
-                    Label(subframe,text=('x^%s Coefficient: %.5e ± %.5e' % (powercoeff,p[i],fittingerror[i])),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
-            else: #if it is x^0 then it is the y intercept so display it as just a coefficient with uncertainty
-                Label(subframe,text=('y Intercept: %.5e ± %.5e' % (p[i],fittingerror[i])),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
-            powercoeff-=1 #remove one from the powercoeff as when powercoeff=0 the whole equation is iterated over
-            labelrow+=1 #add one to the label row so the new label displays on the next
-    if(gradpoints!=''): #if they specified a gradient ordinate display the gradient with uncertainty at that point
-        Label(subframe,text=('Gradient At x=%s: %.5e ± %.5e' % (coordinates,gradval,gradienterror)),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+    if('loss' in results): #how the robust fit treated outliers and how many fits it took
+        Label(subframe,text=robustsummary(results),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+        labelrow+=1
+    if(results.get('odr')): #the reduced chi squared includes how far the x values had to move
+        Label(subframe,text='Fitted Using X And Y Errors (Orthogonal Distance Regression)',relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+        labelrow+=1
+    if('selection' in results): #show how each power compared and which was chosen before its parameters
+        selection = results['selection']
+        for i in range(0,len(selection['powers'])):
+            Label(subframe,text=('Power %d: Reduced Chi Squared %.4g, AIC %.4g, BIC %.4g, F-test p %.3g' % (selection['powers'][i],selection['redchi2'][i],selection['aic'][i],selection['bic'][i],selection['fprob'][i])),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+            labelrow+=1
+        Label(subframe,text=('Best Power: %d' % selection['best']),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+        labelrow+=1
+    for i in range(0,len(p)): #loop over the number of coefficients and display each with its name and uncertainty
+        Label(subframe,text=('%s: %.5e ± %.5e' % (results['names'][i],p[i],fittingerror[i])),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+        labelrow+=1 #add one to the label row so the new label displays on the next
+    if('gradients' in results): #if they specified gradient ordinates display the gradient with uncertainty at each point
+        gradients = results['gradients']
+        for i in range(0,len(gradients['x'])):
+            Label(subframe,text=('Gradient At x=%s: %.5e ± %.5e' % (gradients['x'][i],gradients['values'][i],gradients['errors'][i])),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+            labelrow+=1
     else:
         pass
-    plt.tight_layout() #ensure graph labels do not overlap
-    plt.show() #display the graphs
-    plottitle = plottitle.replace(' ','') #remove spaces from the title string for naming the file
-    if(outfilepath!=''): #if a path was specified save it to that with as the plottitle.png
-        titlestring = outfilepath+'/'+plottitle+'.png'
-    else: #if no path was specified save it to the current directory of the code as plottitle.png
-        titlestring = plottitle+'.png'
+    if('bootstrap' in results): #if asked display the bootstrap confidence intervals below the parameters
+        labelrow = bootstraplabels(results['bootstrap'],results['names'],labelrow)
+    fig1.canvas.draw_idle() #redraw a reused figure with the new data
+    plt.show(block=False) #display the graphs without blocking, the window's main loop keeps them responding
     try: #try and save the file to the output path specified
-        fig1.savefig(titlestring, bbox_inches="tight")
+        savefigure(fig1, outfilepath, plottitle)
     except: #if the specified output path does not exist then warn the user and inform them it will save to the directory of the code
         errorwarning('Error:\nOutput directory not found, graph will attempt to be saved to the same directory as this code by default when this window is closed.\nCheck to see if you made a typo when specifying the output path.')
-        titlestring = plottitle+'.png'
-        fig1.savefig(titlestring, bbox_inches="tight")
+        savefigure(fig1, '', plottitle)
+    saverecord(results, outfilepath)
+
+#plot a custom law fit and display its fitting parameters, along with the bootstrap intervals if they were worked out
+def customplot(results, xtitle, ytitle, plottitle, outfilepath, mstyle, mcolour, ecolour1, lstyle, msize):
+    x, y, err = results['data']
+    paramvals = results['params']
+    paramerrs = results['errors']
+    reducedchisquared = results['redchi2']
+    userfittingparams = results['names']
+    
+    fig1 = guifigure() #the same figure 1 each time
+    drawfit(fig1,x,y,err,results,xtitle,ytitle,plottitle,mstyle,mcolour,ecolour1,lstyle,msize)
+    fig1.canvas.draw_idle() #redraw a reused figure with the new data
+    plt.show(block=False) #show the plot without blocking, the window's main loop keeps it responding
+    
+    #display label stating that fitting parameters will follow
+    resultslabel = Label(subframe,text='Fitting Parameters:',relief='solid').grid(row=0,column=0,sticky='nsew')
+    #display label showing reduced chi squared value for fit
+    chilabel = Label(subframe, text=('Reduced Chi Squared: %8.6f' % reducedchisquared),relief='solid').grid(row=1,column=0,sticky='nsew')
+    labelrow = 2 #variable to determine what row the next parameter should be displayed on
+    if('loss' in results): #how the robust fit treated outliers and how many fits it took
+        Label(subframe,text=robustsummary(results),relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+        labelrow+=1
+    if(results.get('odr')): #the reduced chi squared includes how far the x values had to move
+        Label(subframe,text='Fitted Using X And Y Errors (Orthogonal Distance Regression)',relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+        labelrow+=1
+    for i in range(0,len(paramvals)): #loop over the number of parameter values
+        #define the label text as the [fitting parameter]: value ± uncertainty
+        textstring = (userfittingparams[i]+': %.5e ± %.5e' % (paramvals[i],paramerrs[i])) 
+        #create and display label of that fitting parameter text
+        Label(subframe,text=textstring,relief='solid').grid(row=labelrow,column=0,sticky='nsew')
+        labelrow+=1 #increase the next row value by one
+    if('bootstrap' in results): #if asked display the bootstrap confidence intervals below the parameters
+        labelrow = bootstraplabels(results['bootstrap'],userfittingparams,labelrow)
+    
+    try: #if the outfile path has been specified try and save the figure to it
+        savefigure(fig1,outfilepath,plottitle)
+    except: #if the outfile path has failed inform the user that it could not find it so the graph will be saved to the direcotry of the code
+        errorwarning('Error:\nOutput directory not found, graph will attempt to be saved to the same directory as this code by default when this window is closed.\nCheck to see if you made a typo when specifying the output path.')
+        savefigure(fig1,'',plottitle)
+    saverecord(results, outfilepath)
 
 #callback function to open a link in the default web browser
 def callback(url):
@@ -204,8 +1500,8 @@ def customhelp():
     #create a new scrollable canvas to display the list of functions in
     canvascreate2()
     #some extra information to watch out for when using custom mode
-    constantslabel = Label(subframe2,text='Please replace constants with their values in the equations as the code will not recognise constant names.').grid(row=0,column=0,columnspan=4)
-    naminglabel = Label(subframe2,text='Please also ensure that your fitting parameter names do not containt "x" as the code will try to replace part of the word with x values.\nNote all trigonometric functions work in radians\nAlso note functions may not be compatible with complex numbers.').grid(row=1,column=0,columnspan=4)
+    constantslabel = Label(subframe2,text='The constants %s can be used by name in the equations, please replace any other constants with their values.' % ', '.join(equationconstants)).grid(row=0,column=0,columnspan=4)
+    naminglabel = Label(subframe2,text='Fitting parameter names can be any single word made of letters, numbers and underscores that does not start with a number.\nNote all trigonometric functions work in radians\nAlso note functions may not be compatible with complex numbers.').grid(row=1,column=0,columnspan=4)
     
     #the following is code to define a grid of labels that show the name/formatting of a mathematical funciton on the left and how to format it in the code on the right
     Label(subframe2,text='Function Name',relief='solid').grid(row=2,column=1,sticky='nsew')
@@ -289,6 +1585,97 @@ def customhelp():
     
     helpwin.mainloop() #display and loop the help window
 
+#load a data file and fit it for the window, this runs on the background thread so any problem is raised as a ValueError holding the message to show the user
+#gradients are the comma separated x ordinates to find the gradient at, if any, and bootstrap the number of resamples to bootstrap the uncertainties from
+def fitguidata(filepath, spec, progress, gradients='', bootstrap=0):
+    start = time.perf_counter()
+    try: #check if the data file can be found and opened to read
+        x, y, err, xerr = readdata(filepath,spec.get('columns',3))
+    except OSError:
+        raise ValueError('Error:\nFile cannot be found\nEnsure that you have typed the directory and file name correctly')
+    except ValueError as error: #if a line cannot be split up and floated
+        raise ValueError('Error:\n%s\nEnsure that all your values are numbers with no extra spaces or characters and there are no column headings in text form.\nAlso ensure values are comma seperated (file should be either .txt split by commas or .csv).' % error)
+    read = time.perf_counter()-start
+    if(len(x)!=len(y) or len(y)!=len(err) or len(x)!=len(err)): #check if the same number is given for x, y and err values
+        raise ValueError("Error:\nYour data points are not all the same length.\nThis means that either your x data, y data or errors data does not have the same number of points as the other.\nLength of x data: %s\nLength of y data: %s\nLength of errors data: %s\nPlease adjust your input file accordingly before trying to plot." % (str(len(x)),str(len(y)),str(len(err))))
+    if(spec.get('odr')): #the x errors are only used by a fit with x errors
+        if(xerr is None):
+            raise ValueError('Error:\nFitting with x errors needs a fourth column of x errors in the data file, in the format x,y,y_error,x_error.')
+        spec = dict(spec,xerror=xerr)
+    if(len(x)<5): #check that there is at least 5 data points to plot
+        raise ValueError("Error:\nIn order to calculate an accurate fit you need to have at least 5 data points.\nYour data has less than this hence a fit cannot be plotted.\nPlease add more data points to the input file until you have at least 5.")
+    
+    try: #fit the data, or reuse the last fit of the same data
+        start = time.perf_counter()
+        results = cachedfit(x,y,err,dict(spec,progress=progress))
+    except FitCancelled:
+        raise
+    except ValueError as error:
+        if(spec.get('equation') is None): #polynomial fit
+            raise ValueError('Error:\n%s' % error)
+        raise ValueError('Error:\n%s\nOnly the constants %s can be used by name, please replace any other constants with their values and check your fitting parameters are spelt the same as in the equation.' % (error,', '.join(equationconstants)))
+    except Exception:
+        if(spec.get('equation') is None):
+            raise
+        raise ValueError('Error:\nYour equation could not be fitted to the data.\nEnsure that your equation is formatted correctly and gives real values over your data with the guesses provided, click Custom Help button for details.')
+    results['timings'] = {'read': read, 'fit': time.perf_counter()-start}
+    if(gradients!=''): #these have already been validated so float them
+        results['gradients'] = fitgradient(results,[float(i) for i in gradients.split(',')])
+    if(bootstrap>0): #the resamples are fitted on every core
+        try:
+            results['bootstrap'] = bootstrapfit(results,x,y,err,bootstrap,workers=0,progress=progress,bounds=spec.get('bounds'))
+        except RuntimeError as error:
+            raise ValueError('Error:\n%s' % error)
+    results.update({'data': (x,y,err), 'file': filepath, 'inputhash': datahash(x,y,err,*([xerr] if spec.get('odr') else []))})
+    return results
+
+#start a fit on the background thread so the window keeps responding while it runs, job is passed the progress dictionary the fit updates and done is called with its results on the tk thread
+def runfit(job, done):
+    global fitprogress
+    fitprogress = {'cancel': threading.Event(), 'nfev': 0, 'njev': 0, 'step': 0, 'steps': 0, 'start': time.perf_counter()}
+    future = fitexecutor.submit(job,fitprogress)
+    plotbutton.config(state='disabled') #one fit at a time
+    cancelbutton.config(state='normal')
+    root.after(100,pollfit,future,fitprogress,done)
+
+#check on the background fit from the tk thread every 100ms, updating the progress display until it finishes, then show its results or the reason it failed
+def pollfit(future, progress, done):
+    elapsed = time.perf_counter()-progress['start']
+    if(not future.done()):
+        if(progress['cancel'].is_set()):
+            text = 'Cancelling... %.1f s' % elapsed
+        else:
+            text = 'Fitting... %.1f s' % elapsed
+            if(progress['nfev']>0): #custom law fits count their evaluations, one jacobian is worked out each iteration
+                text += ', %d iterations, %d function evaluations' % (progress['njev'],progress['nfev'])
+            if(progress['steps']>0): #starting points or bootstrap chunks finished
+                text += ', step %d of %d' % (progress['step'],progress['steps'])
+        progresslabel.config(text=text)
+        root.after(100,pollfit,future,progress,done)
+        return
+    plotbutton.config(state='normal')
+    cancelbutton.config(state='disabled')
+    try:
+        results = future.result()
+    except FitCancelled:
+        progresslabel.config(text='Fit cancelled after %.1f s' % elapsed)
+        return
+    except ValueError as error: #the message was written for the user by fitguidata
+        progresslabel.config(text='')
+        errorwarning(str(error))
+        return
+    except Exception as error:
+        progresslabel.config(text='')
+        errorwarning('Error:\nThe fit failed unexpectedly:\n%s' % error)
+        return
+    progresslabel.config(text='Fitted in %.1f s' % elapsed)
+    done(results)
+
+#stop the fit running behind the window, it stops the next time it evaluates the equation
+def cancelfit():
+    if(fitprogress is not None):
+        fitprogress['cancel'].set()
+
 #define function to display error warnings where an error message is passed and displayed
 def errorwarning(message):
     errorwin = Tk() #define error window
@@ -300,8 +1687,8 @@ def errorwarning(message):
     errorwin.mainloop() #display and loop the error window
 
 #defining plotting function where code gets the user inputs and figures out what plot to do
-def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle,outfilepath,mstyle,mcolour,ecolour,lstyle,msize):
-    global equation, userfittingparams, firstrun, subframe, root, paramsframe, advancedframe
+def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle,outfilepath,mstyle,mcolour,ecolour,lstyle,msize,weight,boundsvar,evolutionvar,bootstrapvar,selectvar,basisvar,odrvar,lossvar,clipvar,columnsvar):
+    global subframe, root, paramsframe, advancedframe
     
     try: #attempt to fetch any advanced mode options 
         if(advancedframe.grid_slaves(row=1,column=0)!=[]): #check if the advanced mode tab is open or not
@@ -356,12 +1743,7 @@ def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle
     ecolourstring = ecolourstring.replace('"','')
     lstylestring = lstylestring.replace('"','')
     
-    #if there are already fitting parameters listed remoce the frame of them to prevent overlap in display
-    if(root.grid_slaves(row=14,column=1)!=[]):
-        paramsframe.grid_forget()
-    else:
-        pass
-    #create new scrollable frame for the fitting parameters incase there is a lot
+    #clear the scrollable frame for the fitting parameters, it is only created the first time
     canvascreate()
     filepath = dirpath.get() #get input of path to file
     filepath = filepath.replace("\\","/") #replace \ with / as \ is a special character in python that starts indicating special formatting
@@ -369,6 +1751,22 @@ def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle
     ytitle = ylabel.get() #get the y label text
     title = graphtitle.get() #get the title text
     version = method.get() #get either a vallue of one or two for polynomial and custom fit respectively
+    weighted = (weight.get()==1) #whether the y errors should be used to weight the fit
+    bootstrap = 1000 if bootstrapvar.get()==1 else 0 #number of resamples to bootstrap the parameter uncertainties from, if any
+    odr = (odrvar.get()==1) #whether to fit with the x errors as well
+    if(odr and bootstrap>0):
+        errorwarning('Error:\nBootstrap intervals cannot be worked out for a fit with x errors.\nPlease untick one of them.')
+        return
+    loss = {'Least Squares': 'linear', 'Soft L1': 'soft_l1', 'Huber': 'huber', 'Cauchy': 'cauchy'}[lossvar.get()] #loss the fit uses, anything but least squares resists outliers
+    try: #sigma to clip points beyond, blank or zero for no clipping
+        clip = float(clipvar.get()) if clipvar.get().strip()!='' else 0
+    except ValueError:
+        errorwarning('Error:\nThe sigma clipping threshold must be a number such as 3, or left blank to not clip any points.')
+        return
+    robust = (loss!='linear' or clip>0)
+    if(robust and (odr or bootstrap>0)):
+        errorwarning('Error:\nA robust loss or sigma clipping cannot be combined with x errors or bootstrap intervals.\nPlease choose Least Squares and leave the clipping blank, or untick the other option.')
+        return
     outpath = outfilepath.get() #get output file directory
     outpath = outpath.replace("\\","/") #same as for input file replacements
 
@@ -381,7 +1779,7 @@ def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle
         temp = guess.get() #get the guess values from user input
         paramguesses = [] #define empty list for floated version of parameter guesses
         templist = temp.split(',') #split the guesses on commas to make a list
-        userfittingparams = fittingparameterstemp.split(',') #split the user fitting parameters on commas to make a list
+        userfittingparams = [i.strip() for i in fittingparameterstemp.split(',')] #split the user fitting parameters on commas to make a list
         try: #try looping over the list of guesses and floating them, if successfuly append to the paramguesses list
             for i in range(0,len(templist)):
                 paramguesses.append(float(templist[i]))
@@ -395,11 +1793,6 @@ def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle
     else:
         pass
     
-    #define empty list of x, y and error values
-    x = [] 
-    y = []
-    err = []
-    
     if(version==1): #if it is a polynomial fit
         
         try: #check that max power is a number, if not give an error message explaining the problem to the user then return without plotting
@@ -415,48 +1808,21 @@ def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle
             pass
         
         if(coords!=''): #check if an input was specified for the x ordinate value
-            try: #check if the value of the x ordinate is a float, if not give an error message explaining the problem to the user then return without plotting
-                float(coords)
+            try: #check if the values of the x ordinates are floats, if not give an error message explaining the problem to the user then return without plotting
+                [float(i) for i in coords.split(',')]
             except:
-                errorwarning('Error:\nThe gradient X ordinate you specified was not a number.\nPlease either enter a number for the gradient at that X value or leave it blank to not get the gradient.')
+                errorwarning('Error:\nThe gradient X ordinate you specified was not a number.\nPlease either enter a number, or comma separated numbers, for the gradient at those X values or leave it blank to not get the gradient.')
                 return
         else:
             pass
         
-        try: #check if the data file can be found and opened to read, if not give an error message explaining the problem to the user then return without plotting
-            file=open(filepath,'r')
-        except:
-            errorwarning('Error:\nFile cannot be found\nEnsure that you have typed the directory and file name correctly')
+        spec = {'power': int(float(maxpower)), 'weighted': weighted, 'select': selectvar.get()==1, 'basis': basisvar.get().split(' ')[0].lower(), 'odr': odr, 'loss': loss, 'clip': clip, 'columns': int(columnsvar.get())}
+        if((odr or robust) and (spec['select'] or spec['basis']!='power')):
+            errorwarning('Error:\nA fit with x errors, a robust loss or sigma clipping can only be done for a single power in the Power basis.')
             return
-        
-        for line in file: #loop over each line in the file
-            try: #try and split up each line on commas and append the floated values to the lists, if not give an error message explaining the problem to the user then return without plotting
-                if(line!='\n'): #if the line isn't an acccidental blank new line
-                    contents = line.split(',')
-                    x.append(float(contents[0]))
-                    y.append(float(contents[1]))
-                    contents[2] = contents[2].strip('\n')
-                    err.append(float(contents[2]))        
-                else:
-                    pass
-            except:
-                errorwarning('Error:\nAt least one value in your file is unable to be used.\nEnsure that all your values are numbers with no extra spaces or characters and there are no column headings in text form.\nAlso ensure values are comma seperated (file should be either .txt split by commas or .csv).')
-                return
-        
-        file.close() #close the file
-        
-        if(len(x)!=len(y) or len(y)!=len(err) or len(x)!=len(err)): #check if the same number is given for x, y and err values
-            errorwarning("Error:\nYour data points are not all the same length.\nThis means that either your x data, y data or errors data does not have the same number of points as the other.\nLength of x data: %s\nLength of y data: %s\nLength of errors data: %s\nPlease adjust your input file accordingly before trying to plot." % (str(len(x)),str(len(y)),str(len(err))))
-            return
-        else:
-            pass
-        if(len(x)<5): #check that there is at least 5 data points to plot
-            errorwarning("Error:\nIn order to calculate an accurate fit you need to have at least 5 data points.\nYour data has less than this hence a fit cannot be plotted.\nPlease add more data points to the input file until you have at least 5.")
-            return
-        else:
-            pass
-        
-        powerplot(x,y,err,maxpower,xtitle,ytitle,title,outpath,coords,mstylestring,mcolourstring,ecolourstring,lstylestring,msizefloat) #run the plotting function for the polynomial fitting passing all relevant data
+        #load and fit the data on the background thread then plot it and show the fitting parameters back on the tk thread
+        runfit(lambda progress: fitguidata(filepath,spec,progress,coords,bootstrap),
+               lambda results: powerplot(results,xtitle,ytitle,title,outpath,mstylestring,mcolourstring,ecolourstring,lstylestring,msizefloat))
         
     else: #if the plot method is custom law instead
         
@@ -466,8 +1832,14 @@ def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle
         else:
             pass
         
+        try: #parse the equation so the fitting parameters can be checked by name, if it cannot be read give an error message explaining the problem to the user then return without plotting
+            equationtree = parseequation(equation)
+        except ValueError as error:
+            errorwarning('Error:\n%s\nIf you are unsure how to write your equation please select the Custom Help button.' % error)
+            return
+        
         #check if user fitting parameters are blank or if any of them are not in the equation, if so give an error message explaining the problem to the user then return without plotting
-        if(userfittingparams==[] or userfittingparams=='' or userfittingparams==[''] or any(i not in equation for i in userfittingparams)):
+        if(userfittingparams==[] or userfittingparams=='' or userfittingparams==[''] or any(i not in equationnames(equationtree) for i in userfittingparams)):
             errorwarning('Error:\nPlease specify at least one fitting parameter used within you equation.\nA fitting parameter is a constant that the equation can adjust the value of to improve the fit of the data.\nFor example if you are fitting a trigonometric function to an x value that is an angle,\nyou can replace x with (x+phi) which is an arbitrary phase shift.\nIf you are not expecting a phase shift in your result the value of phi returned should be close to zero.\nThis is a further way of verifying that the fit is good as well as the reduced chi squared.\nFor more information please review the information by clicking the Custom Help button.\nIf you have provided at least one fitting parameter and you are seeing this message,\nthis means that at least one fitting parameter you listed is not used in the equation.')
             return
         else:
@@ -487,139 +1859,33 @@ def plot(dirpath,method,power,gradords,eqn,params,guess,xlabel,ylabel,graphtitle
         else:
             pass
         
-        #some catches to try and fix common formatting errors
-        try:
-            equation = equation.replace('^','**')
-        except:
-            pass
-        try:
-            equation = equation.replace('arcsin','asin')
-        except:
-            pass
-        try:
-            equation = equation.replace('arccos','acos')
-        except:
-            pass
-        try:
-            equation = equation.replace('arctan','atan')
-        except:
-            pass
-
-        firstrun = True #mark it as the first run
-    
-        try: #check if the data file can be found and opened to read, if not give an error message explaining the problem to the user then return without plotting
-            file=open(filepath,'r')
-        except:
-            errorwarning('Error:\nFile cannot be found\nEnsure that you have typed the directory and file name correctly')
-            return
-        
-        for line in file: #loop over the lines in the file
-            try: #try and split up each line on commas and append the floated values to the lists, if not give an error message explaining the problem to the user then return without plotting
-                if(line!='\n'): #check that the line isn't an accidental blank line
-                    contents = line.split(',')
-                    x.append(float(contents[0]))
-                    y.append(float(contents[1]))
-                    contents[2] = contents[2].strip('\n')
-                    err.append(float(contents[2]))        
-                else:
-                    pass
-            except:
-                errorwarning('Error:\nAt least one value in your file is unable to be used.\nEnsure that all your values are numbers with no extra spaces or characters and there are no column headings in text form.\nAlso ensure values are ccomma seperated (file should be either .txt split by commas or .csv.')
+        spec = {'equation': equation, 'params': userfittingparams, 'guesses': paramguesses, 'weighted': weighted, 'odr': odr, 'loss': loss, 'clip': clip, 'columns': int(columnsvar.get())}
+        if(boundsvar.get().strip()!=''): #if bounds were given search within them from many starting points instead of only from the guesses
+            if(odr or robust):
+                errorwarning('Error:\nA fit with x errors, a robust loss or sigma clipping starts from the guesses so cannot search within bounds.\nLeave the bounds blank, or untick Use X Errors and choose Least Squares with no clipping.')
                 return
-        
-        file.close() #close the file
-        
-        if(len(x)!=len(y) or len(y)!=len(err) or len(x)!=len(err)): #check if the same number is given for x, y and err values
-            errorwarning("Error:\nYour data points are not all the same length.\nThis means that either your x data, y data or errors data does not have the same number of points as the other.\nLength of x data: %s\nLength of y data: %s\nLength of errors data: %s\nPlease adjust your input file accordingly before trying to plot." % (str(len(x)),str(len(y)),str(len(err))))
-            return
-        else:
-            pass
-        if(len(x)<5): #check that there is at least 5 data points to plot
-            errorwarning("Error:\nIn order to calculate an accurate fit you need to have at least 5 data points.\nYour data has less than this hence a fit cannot be plotted.\nPlease add more data points to the input file until you have at least 5.")
-            return
-        else:
-            pass
-        
-        #optimise the fit where the new y values are calculated from the fitting function, the x and y values are read from the file and the parameter guesses are specified from the user input
-        try:
-            fittingparams = optimize.curve_fit(fitting,x,y,p0=paramguesses) 
-        except:
-            errorwarning('Error:\nYour equation could not be evaluated. If you are seeing this message ensure none of your fitting parameters contain the letter x\n This is because this can cause parts of their names to be replaced with numbers triggering a formatting error.\nIf this is not the case ensure that your equation is formatted correctly, click Custom Help button for details.')
-            return
-        ans,cov = fittingparams #store the results of the optimised version as answer and covariance
-        
-        paramvals = [0]*len(userfittingparams) #create list of parameter values
-        paramerrs = [0]*len(userfittingparams) #create list of parameter errors
-        for i in range(0,len(paramvals)): #loop over the parameter values and store them as the corresponding answer values
-            paramvals[i] = ans[i]
-        
-        fitvals = fitting(x,*paramvals) #get the fitting y values 
-        chisquared = 0 #Define the chi squared value for this fit
-        chisquareddata = np.empty(len(y), dtype=float) #Define an empty array to fill
-        for a in range(0, len(y)):
-            chisquareddata[a] = ((y[a] - fitvals[a])/err[a])**2 #Calulate the contribution to the chi squared value of each point for Cox-Voinov
-            chisquared += chisquareddata[a] #Calculate the value of chi squared as the sum of the previous values
-        N = (len(y)-len(ans)) #Define degrees of freedom as number of fitting parameters subtracted from the number of points
-        reducedchisquared = chisquared/N #Calculate reduced chi squared as chi squared over degrees of freedom
-        cov2 = cov*(len(y)-len(userfittingparams)-2)/chisquared #calculate a new covariance matrix for the fitting paramaeter errors
-        
-        residuals = [] #define empty residuals list
-        for i in range(0,len(y)): #loop over the number of y values
-            residuals.append(y[i]-fitting(x,*paramvals)[i]) #append the residuals with the difference between the y values and the fitting values
-        
-        for i in range(0,len(paramvals)): #loop over the parameter values size
-            paramerrs[i] = np.sqrt(np.diag(cov2))[i] #calculate errors on fitting parameters as the square root of the diagonal components of the covariance matrix
-        
-        fig1 = plt.figure(1,figsize=(9,6)) #plot new figure
-        plt.subplot(211) #add new subplot to figure
-        plt.plot(x,fitting(x,*paramvals),linestyle=lstylestring) #plot the fitting line calculated
-        plt.errorbar(x,y,yerr=err,ecolor=ecolourstring,linestyle = 'None',color=mcolourstring,marker=mstylestring,markersize=msizefloat) #plot the values with their uncertainties
-        plt.title(title) #Add the title to the plot from specified user input
-        plt.xlabel(xtitle) #Add the label to the x axis from specified user input
-        plt.ylabel(ytitle) #Add the label to the y axis from specified user input
-        plt.grid() #add grid to the plot
-        
-        plt.subplot(212) #add new subplot to the figure
-        r=[0]*len(y) #create list of 0 values for plotting y=0 graph
-        plt.errorbar(x,residuals,yerr = err, ecolor=ecolourstring, color=mcolourstring, linestyle = 'None',marker=mstylestring,markersize=msizefloat) #Plot calculated residuals data with no line
-        plt.plot(x,r) #Plot y=0 line to see distance to residuals
-        plt.grid() #Plot a grid on the axes
-        plt.title("Residuals") #Add the title to the plot
-        plt.tight_layout() #stop labels overlapping
-        plt.show() #show the plot
-        
-        #display label stating that fitting parameters will follow
-        resultslabel = Label(subframe,text='Fitting Parameters:',relief='solid').grid(row=0,column=0,sticky='nsew')
-        #display label showing reduced chi squared value for fit
-        chilabel = Label(subframe, text=('Reduced Chi Squared: %8.6f' % reducedchisquared),relief='solid').grid(row=1,column=0,sticky='nsew')
-        labelrow = 2 #variable to determine what row the next parameter should be displayed on
-        for i in range(0,len(paramvals)): #loop over the number of parameter values
-            #define the label text as the [fitting parameter]: value ± uncertainty
-            textstring = (userfittingparams[i]+': %.5e ± %.5e' % (paramvals[i],paramerrs[i])) 
-            #create and display label of that fitting parameter text
-            Label(subframe,text=textstring,relief='solid').grid(row=labelrow,column=0,sticky='nsew')
-            labelrow+=1 #increase the next row value by one
-        
-        plottitle = title.replace(' ','') #replace spaces in the title with nothing to make file title
-        if(outpath!=''):
-            titlestring = outpath+'/'+plottitle+'.png'
-        else:
-            titlestring = plottitle+'.png'
-        try: #if the outfile path has been specified try and save the figure to it
-            fig1.savefig(titlestring, bbox_inches="tight")
-        except: #if the outfile path has failed inform the user that it could not find it so the graph will be saved to the direcotry of the code
-            errorwarning('Error:\nOutput directory not found, graph will attempt to be saved to the same directory as this code by default when this window is closed.\nCheck to see if you made a typo when specifying the output path.')
-            titlestring = plottitle+'.png'
-            fig1.savefig(titlestring, bbox_inches="tight")
+            try:
+                spec.update({'bounds': parsebounds(boundsvar.get(),len(userfittingparams)), 'evolution': evolutionvar.get()==1, 'fitworkers': 0})
+            except ValueError as error:
+                errorwarning('Error:\n%s\nFor example for three fitting parameters type 0:10, 0:5, -pi:pi\nLeave the bounds blank to start the fit only from the guesses.' % error)
+                return
+        #load and fit the data on the background thread then plot it and show the fitting parameters back on the tk thread
+        runfit(lambda progress: fitguidata(filepath,spec,progress,'',bootstrap),
+               lambda results: customplot(results,xtitle,ytitle,title,outpath,mstylestring,mcolourstring,ecolourstring,lstylestring,msizefloat))
 
 #works as scrollfunc2 above
 def scrollfunc(event):
     global canvas
     canvas.configure(scrollregion=canvas.bbox("all"),width=400,height=300)
 
-#works as canvascreate2 above
+#works as canvascreate2 above, but if the frame already exists the labels from the last plot are destroyed and it is reused
 def canvascreate():
     global root, canvas, subframe, paramsframe
+    if(paramsframe is not None):
+        for widget in subframe.winfo_children():
+            widget.destroy()
+        canvas.yview_moveto(0) #back to the top for the new parameters
+        return
     paramsframe = Frame(root)
     paramsframe.grid(row=12,column=1)
     canvas=Canvas(paramsframe)
@@ -640,7 +1906,11 @@ def advanced():
     if(advancedframe.grid_slaves(row=1,column=0)!=[]):
         advancedstring.set("Advanced Styling ▶▶") #display text as tab closed
         advancedframe.grid_slaves(row=1,column=0)[0].grid_remove() #hide the advanced options
-    #if advanced tab was closed
+    #if advanced tab was opened before show the same options again, keeping what was entered in them
+    elif(subadvancedframe is not None):
+        advancedstring.set("Advanced Styling ▼▼")
+        subadvancedframe.grid()
+    #if advanced tab was never opened
     else:
         advancedstring.set("Advanced Styling ▼▼") #display text as tab opened
         subadvancedframe = Frame(advancedframe) #add frame for advanced options
@@ -693,8 +1963,575 @@ def advanced():
         markersizeentry = Entry(subadvancedframe,textvariable=markersize1,relief='solid')                                                
         markersizeentry.grid(row=5,column=1,sticky='nsew')
         
+#save a figure as [plottitle].png in the output directory, or in the current directory if no output directory was given, returning the file name used
+def savefigure(fig, outfilepath, plottitle):
+    plottitle = plottitle.replace(' ','') #remove spaces from the title string for naming the file
+    if(outfilepath!=''): #if a path was specified save it to that with as the plottitle.png
+        titlestring = outfilepath+'/'+plottitle+'.png'
+    else: #if no path was specified save it to the current directory of the code as plottitle.png
+        titlestring = plottitle+'.png'
+    atomicwrite(titlestring, lambda path: fig.savefig(path, format='png', bbox_inches="tight"))
+    return titlestring
+
+#write a file through a function given a temporary path next to it, then rename it over the old file so anything reading it never sees it half written
+#the temporary file is hidden so tools reading every file in the directory, such as a parquet dataset, skip it
+def atomicwrite(path, write):
+    directory, name = os.path.split(path)
+    temppath = os.path.join(directory,'.%s.%d.tmp' % (name,os.getpid()))
+    try:
+        write(temppath)
+        os.replace(temppath,path)
+    finally:
+        if(os.path.exists(temppath)): #the write failed part way
+            os.remove(temppath)
+
+#fit and plot a single data file without the gui, spec is a dictionary holding either the polynomial power or the custom equation, parameters and guesses
+def fitfile(filepath, spec, outfilepath='', xtitle='', ytitle=''):
+    start = time.perf_counter()
+    if(spec.get('stream')): #files too large for memory are fitted in chunks and not plotted, reading and fitting are done together so only the total is timed
+        results = streamfitresults(streampolyfit(filepath,spec['power'],columns=spec.get('columns',3),weighted=spec.get('weighted',False)))
+        results.update({'file': filepath, 'timings': {'fit': time.perf_counter()-start}})
+        return results
+    x, y, err, xerr = readdata(filepath,spec.get('columns',3))
+    read = time.perf_counter()
+    if(spec.get('odr')): #the x errors are passed on in the spec
+        if(xerr is None):
+            raise ValueError('Fitting with x errors needs a fourth column of x errors.')
+        spec = dict(spec,xerror=xerr)
+    if(len(x)<5): #the same minimum number of points as the gui
+        raise ValueError('At least 5 data points are needed to calculate an accurate fit.')
+    if(spec.get('cache',True)): #reuse the fit if this data has been fitted the same way before
+        results = cachedfit(x,y,err,spec)
+    else:
+        results = specfit(x,y,err,spec)
+    results.update({'timings': {'read': read-start, 'fit': time.perf_counter()-read}, 'inputhash': datahash(x,y,err,*([xerr] if spec.get('odr') else []))}) #the cold start and bootstrap below are not counted in the fit time
+    if(spec.get('coldguesses') is not None): #fit again from the original guesses to count the evaluations a cold start needs
+        try:
+            cold = specfit(x,y,err,dict(spec,guesses=spec['coldguesses']))
+            results.update({'coldnfev': cold['nfev'], 'coldnjev': cold['njev']})
+        except RuntimeError: #the cold start did not converge at all
+            pass
+    if(spec.get('bootstrap')): #confidence intervals from refitting resamples of the data
+        results['bootstrap'] = bootstrapfit(results,x,y,err,spec['bootstrap'],workers=spec.get('fitworkers',1),bounds=spec.get('bounds'))
+    drawfile(filepath,x,y,err,results,spec,outfilepath,xtitle,ytitle)
+    return results
+
+#work out any gradients asked for in the spec of a fitted file then draw its graph and save it, named after the file unless the spec gives a title
+def drawfile(filepath, x, y, err, results, spec, outfilepath='', xtitle='', ytitle=''):
+    if(spec.get('gradients') is not None): #gradients of the fit at the x ordinates asked for
+        results['gradients'] = fitgradient(results,spec['gradients'])
+    plottitle = spec.get('title') or os.path.splitext(os.path.basename(filepath))[0] #default to naming the graph after the data file
+    start = time.perf_counter()
+    fig = plt.figure(figsize=(9,6))
+    try:
+        drawfit(fig,x,y,err,results,xtitle,ytitle,plottitle,'x','blue','red','-',5)
+        results['image'] = savefigure(fig,outfilepath,plottitle)
+    finally:
+        plt.close(fig) #close the figure so memory does not build up over a large batch
+    results.setdefault('timings',{})['draw'] = time.perf_counter()-start
+    results['file'] = filepath
+
+#write the fitting parameters of a batch of fits to a csv table with one row per parameter, files that failed get a single row with the error message
+def writeresults(results, path):
+    with open(path,'w',newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['file','mode','reduced_chi2','parameter','value','error','status'])
+        for result in results:
+            if('errormessage' in result):
+                writer.writerow([result['file'],'','','','','',result['errormessage']])
+                continue
+            for i in range(0,len(result['params'])):
+                writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],result['names'][i],'%.8e' % result['params'][i],'%.8e' % result['errors'][i],'ok'])
+            if('gradients' in result):
+                gradients = result['gradients']
+                for i in range(0,len(gradients['x'])):
+                    writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],'Gradient At x=%.8g' % gradients['x'][i],'%.8e' % gradients['values'][i],'%.8e' % gradients['errors'][i],'ok'])
+            if('selection' in result): #the statistics of every power that was compared, then the chosen power
+                selection = result['selection']
+                for i in range(0,len(selection['powers'])):
+                    for name, key in (('Reduced Chi Squared','redchi2'),('AIC','aic'),('BIC','bic'),('F-test Probability','fprob')):
+                        writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],'Power %d %s' % (selection['powers'][i],name),'%.8e' % selection[key][i],'','ok'])
+                writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],'Best Power','%d' % selection['best'],'','ok'])
+            if('loss' in result): #how many points a robust fit clipped and how many fits that took, which is what it cost
+                writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],'Clipped Points','%d' % np.sum(result['clipped']),'','ok'])
+                writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],'Robust Fits','%d' % result['iterations'],'','ok'])
+                writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],'Clipping Settled','%d' % result['settled'],'','ok'])
+            if('bootstrap' in result): #the interval ends with the bootstrap standard deviation as the error, then the correlation of each pair of parameters
+                bootstrap = result['bootstrap']
+                tail = (100-bootstrap['level'])/2
+                for i in range(0,len(result['names'])):
+                    for j, percentile in enumerate((tail,100-tail)):
+                        writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],'%s %gth Percentile' % (result['names'][i],percentile),'%.8e' % bootstrap['intervals'][i,j],'%.8e' % bootstrap['errors'][i],'ok'])
+                for i in range(0,len(result['names'])):
+                    for j in range(i+1,len(result['names'])):
+                        writer.writerow([result['file'],result['mode'],'%.8g' % result['redchi2'],'Correlation %s, %s' % (result['names'][i],result['names'][j]),'%.8f' % bootstrap['correlation'][i,j],'','ok'])
+
+#the fields of a fit record in order with the arrow type of each, lists are of one value per fitting parameter except the covariance which is flattened row by row
+recordfields = [('file','string'),('status','string'),('mode','string'),('model','string'),('method','string'),('weighted','bool'),('cached','bool'),
+                ('names','list<string>'),('params','list<float64>'),('errors','list<float64>'),('covariance','list<float64>'),
+                ('chi2','float64'),('dof','int64'),('redchi2','float64'),('nfev','int64'),('njev','int64'),
+                ('inputhash','string'),('readtime','float64'),('fittime','float64'),('drawtime','float64'),('recorded','string')]
+
+#name the way a fit was made for its record
+def fitmethod(results):
+    if(results.get('odr')):
+        return 'odr'
+    if('loss' in results):
+        return 'robust %s' % results['loss']
+    if('starts' in results):
+        return 'multistart'
+    if(results['mode']=='polynomial'):
+        return 'selected %s' % results.get('basis','power') if 'selection' in results else results.get('basis','power')
+    return 'least_squares'
+
+#turn the results of one fit into a flat record of plain values with the fields of recordfields, a file that failed keeps its error message as the status and leaves the rest empty
+#the record is the same whether the fit came from the gui, a batch or a shared fit, so records from any of them can be written to the same table
+def fitrecord(results):
+    record = {name: None for name, kind in recordfields}
+    record.update({'file': results.get('file'), 'recorded': time.strftime('%Y-%m-%dT%H:%M:%SZ',time.gmtime())})
+    if('errormessage' in results):
+        record['status'] = results['errormessage']
+        return record
+    timings = results.get('timings',{})
+    record.update({'status': 'ok', 'mode': results['mode'], 'model': results['equation'] if results.get('equation') is not None else 'power %d' % results['power'],
+                   'method': fitmethod(results), 'weighted': bool(results.get('weighted',False)), 'cached': bool(results.get('cached',False)),
+                   'names': [str(i) for i in results['names']], 'params': np.asarray(results['params'],dtype=float).tolist(), 'errors': np.asarray(results['errors'],dtype=float).tolist(),
+                   'covariance': np.asarray(results['cov'],dtype=float).ravel().tolist(), 'chi2': float(results['chi2']), 'dof': int(results['dof']), 'redchi2': float(results['redchi2']),
+                   'nfev': int(results['nfev']) if 'nfev' in results else None, 'njev': int(results['njev']) if 'njev' in results else None, 'inputhash': results.get('inputhash'),
+                   'readtime': timings.get('read'), 'fittime': timings.get('fit'), 'drawtime': timings.get('draw')})
+    return record
+
+#the arrow schema of a table of fit records
+def recordschema():
+    kinds = {'string': pyarrow.string(), 'bool': pyarrow.bool_(), 'float64': pyarrow.float64(), 'int64': pyarrow.int64(),
+             'list<string>': pyarrow.list_(pyarrow.string()), 'list<float64>': pyarrow.list_(pyarrow.float64())}
+    return pyarrow.schema([(name,kinds[kind]) for name, kind in recordfields])
+
+#add fit records to the table at path without rewriting what is already there, the format is csv, jsonl, parquet or arrow and is taken from the extension if not given
+#csv and json lines are appended to, with the csv header only written to a new file and the lists in it written as json
+#parquet and arrow files cannot be appended to, so path is a directory and each call adds a new part file to it which pyarrow.dataset or pandas read back as one table
+def exportrecords(records, path, format=None):
+    if(format is None):
+        format = exportformats.get(os.path.splitext(path)[1].lower())
+        if(format is None):
+            raise ValueError('Cannot tell the export format of %s, give it a .csv, .jsonl, .parquet or .arrow extension.' % path)
+    if(format=='jsonl'):
+        with open(path,'a') as file:
+            for record in records:
+                file.write(json.dumps(record)+'\n')
+    elif(format=='csv'):
+        with open(path,'a',newline='') as file:
+            writer = csv.DictWriter(file,fieldnames=[name for name, kind in recordfields])
+            if(file.tell()==0): #a new or empty file
+                writer.writeheader()
+            for record in records:
+                writer.writerow({name: json.dumps(value) if isinstance(value,list) else value for name, value in record.items()})
+    else:
+        table = pyarrow.Table.from_pylist(records,schema=recordschema())
+        os.makedirs(path,exist_ok=True)
+        stamp, part = '%s-%d' % (time.strftime('%Y%m%dT%H%M%S'),os.getpid()), 0
+        while(os.path.exists(os.path.join(path,'part-%s-%d.%s' % (stamp,part,format)))): #another export from this process in the same second
+            part += 1
+        partpath = os.path.join(path,'part-%s-%d.%s' % (stamp,part,format))
+        if(format=='parquet'):
+            atomicwrite(partpath,lambda temppath: parquet.write_table(table,temppath))
+        else:
+            atomicwrite(partpath,lambda temppath: feather.write_feather(table,temppath))
+    return path
+
+#export format of each file extension
+exportformats = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+#append the record of a fit made in the gui to results.jsonl in the graph output location, so every fit is kept in a form other programs can read
+#nothing is written unless an output location was given, and the user has already been warned if it does not exist
+def saverecord(results, outfilepath):
+    if(outfilepath==''):
+        return
+    try:
+        exportrecords([fitrecord(results)],os.path.join(outfilepath,'results.jsonl'))
+    except OSError:
+        pass
+
+#fit one file for the batch, a file that fails is reported and recorded rather than raising so it cannot stop the rest of the batch
+def batchfitfile(arguments):
+    filepath, spec, outfilepath, xtitle, ytitle = arguments
+    try:
+        return fitfile(filepath,spec,outfilepath,xtitle,ytitle)
+    except Exception as error:
+        sys.stderr.write('%s: %s\n' % (filepath,error))
+        return {'file': filepath, 'errormessage': str(error)}
+
+#set up each worker process of a parallel batch to render its own graphs straight to file
+def batchworkerinit():
+    plt.switch_backend('Agg')
+
+#fit every file in a list, spread across a pool of worker processes if more than one worker is asked for, the results are returned in the same order as the files
+def batchfit(filepaths, spec, outfilepath='', xtitle='', ytitle='', workers=1):
+    arguments = [(filepath,spec,outfilepath,xtitle,ytitle) for filepath in filepaths]
+    if(workers==0): #zero means use every core
+        workers = os.cpu_count() or 1
+    if(workers<=1 or len(filepaths)<=1):
+        return [batchfitfile(i) for i in arguments]
+    chunksize = max(1,len(arguments)//(workers*4)) #send small files to the workers in chunks so the overhead of passing them over is spread out
+    with ProcessPoolExecutor(max_workers=workers,initializer=batchworkerinit) as executor:
+        return list(executor.map(batchfitfile,arguments,chunksize=chunksize))
+
+#fit the same custom law to an ordered series of files such as temperature steps, starting each fit from the solution of the file before as neighbouring optimums are usually close
+#with compare every file is also fitted from the original guesses so the evaluations saved by warm starting can be reported, files are fitted in order so this cannot be spread across workers
+def sweepfit(filepaths, spec, outfilepath='', xtitle='', ytitle='', compare=True):
+    guesses = list(spec['guesses'])
+    results = []
+    for filepath in filepaths:
+        warmspec = dict(spec,guesses=guesses,cache=False,coldguesses=spec['guesses'] if compare else None)
+        try:
+            try:
+                result = fitfile(filepath,warmspec,outfilepath,xtitle,ytitle)
+                result['warm'] = True
+            except RuntimeError: #the previous solution led the optimiser astray so try again from the original guesses
+                result = fitfile(filepath,dict(warmspec,guesses=spec['guesses']),outfilepath,xtitle,ytitle)
+                result['warm'] = False
+            guesses = list(result['params']) #seed the next file from this solution
+        except Exception as error: #a bad file is recorded and the next one starts from the last good solution
+            sys.stderr.write('%s: %s\n' % (filepath,error))
+            result = {'file': filepath, 'errormessage': str(error)}
+        results.append(result)
+    return results
+
+#collect the results of a sweep into arrays with one row per file, files that failed are left as nan
+def sweeptrajectory(results, names):
+    trajectory = {'files': [result['file'] for result in results], 'names': list(names)}
+    for key in ('params','errors'):
+        trajectory[key] = np.full((len(results),len(names)),np.nan)
+    for key in ('redchi2','nfev','njev','coldnfev','coldnjev'):
+        trajectory[key] = np.full(len(results),np.nan)
+    for i, result in enumerate(results):
+        if('errormessage' in result):
+            continue
+        trajectory['params'][i] = result['params']
+        trajectory['errors'][i] = result['errors']
+        for key in ('redchi2','nfev','njev','coldnfev','coldnjev'):
+            trajectory[key][i] = result.get(key,np.nan)
+    return trajectory
+
+#write a sweep trajectory to a csv table with one row per file and a value and error column for each fitting parameter
+def writetrajectory(trajectory, path):
+    with open(path,'w',newline='') as file:
+        writer = csv.writer(file)
+        header = ['file','reduced_chi2','nfev','njev','cold_nfev','cold_njev']
+        for name in trajectory['names']:
+            header.extend([name,name+'_error'])
+        writer.writerow(header)
+        for i in range(0,len(trajectory['files'])):
+            row = [trajectory['files'][i],'%.8g' % trajectory['redchi2'][i]]
+            row.extend(['' if np.isnan(trajectory[key][i]) else '%d' % trajectory[key][i] for key in ('nfev','njev','coldnfev','coldnjev')])
+            for j in range(0,len(trajectory['names'])):
+                row.extend(['%.8e' % trajectory['params'][i,j],'%.8e' % trajectory['errors'][i,j]])
+            writer.writerow(row)
+
+#fit one custom law to every file at once with the parameters named in spec['shared'] taking the same value in all of them, then draw and save the graph of each file
+#files that cannot be read are recorded and left out of the fit, the results of each file are returned in order with the shared fit as a whole
+def sharedfitfiles(filepaths, spec, outfilepath='', xtitle='', ytitle=''):
+    results, datasets, reads = [], [], []
+    for filepath in filepaths:
+        try:
+            start = time.perf_counter()
+            x, y, err, xerr = readdata(filepath,spec.get('columns',3))
+            if(len(x)<5):
+                raise ValueError('At least 5 data points are needed to calculate an accurate fit.')
+            datasets.append((x,y,err))
+            reads.append(time.perf_counter()-start)
+            results.append(None)
+        except (OSError, ValueError) as error:
+            sys.stderr.write('%s: %s\n' % (filepath,error))
+            results.append({'file': filepath, 'errormessage': str(error)})
+    if(datasets==[]):
+        raise ValueError('None of the files could be read.')
+    start = time.perf_counter()
+    shared = sharedfit(datasets,spec['equation'],spec['params'],spec['guesses'],spec['shared'],spec.get('weighted',False))
+    fit = time.perf_counter()-start #the files are fitted together so each is given the time of the whole fit
+    fitted = iter(zip(datasets,reads,shared['datasets']))
+    for i in range(0,len(filepaths)):
+        if(results[i] is None):
+            (x, y, err), read, results[i] = next(fitted)
+            results[i].update({'inputhash': datahash(x,y,err), 'timings': {'read': read, 'fit': fit}})
+            drawfile(filepaths[i],x,y,err,results[i],spec,outfilepath,xtitle,ytitle)
+    shared['datasets'] = results
+    return shared
+
+#fit state and data of one watched file, the streaming polynomial state or recursive custom law state is set up once enough points have arrived
+#previous is the watch of a file that has been replaced, its figure is closed
+def newwatch(filepath, spec, previous=None):
+    if(previous is not None):
+        closewatch(previous)
+    state = {'file': filepath, 'columns': spec.get('columns',3), 'offset': 0, 'growing': True} #the last line of a file still being written is left until it is complete
+    if(spec.get('equation') is None):
+        state.update({'power': int(spec['power']), 'weighted': spec.get('weighted',False), 'n': 0, 'centre': None, 'scale': None})
+    return {'state': state, 'fit': None, 'data': np.empty((3,1024)), 'n': 0, 'results': None, 'dirty': False, 'figure': None}
+
+#close the figure of a watched file that is no longer watched or is being fitted again from the start, so figures do not build up over a long session
+def closewatch(watch):
+    if(watch['figure'] is not None):
+        plt.close(watch['figure'])
+        watch['figure'] = None
+
+#read the rows appended to a watched file since the last update and add them to its fit, only the new bytes are read and parsed and only the new points are fitted
+def updatewatch(watch, spec, chunkpoints=100000):
+    for x, y, err in readchunks(watch['state'],chunkpoints):
+        n = watch['n']
+        if(n+len(x)>watch['data'].shape[1]): #keep the points for drawing in a buffer that doubles in size so appending stays cheap
+            data = np.empty((3,max(n+len(x),2*watch['data'].shape[1])))
+            data[:,:n] = watch['data'][:,:n]
+            watch['data'] = data
+        watch['data'][:,n:n+len(x)] = x, y, err
+        watch['n'] += len(x)
+        if(spec.get('equation') is None):
+            addstreampoints(watch['state'],x,y,err)
+        elif(watch['fit'] is not None):
+            addrecursivepoints(watch['fit'],x,y,err)
+        watch['dirty'] = True
+    if(watch['n']<max(5,len(spec.get('guesses',()))+1)): #the same minimum number of points as the gui, wait for more
+        return
+    if(spec.get('equation') is None):
+        watch['results'] = streamfitresults(watch['state'])
+    else:
+        if(watch['fit'] is None): #fit the points so far from the guesses, or from the solution for the last file watched, then add later points recursively
+            x, y, err = watch['data'][:,:watch['n']]
+            watch['fit'] = startrecursivefit(x,y,err,spec['equation'],spec['params'],spec.get('watchguesses',spec['guesses']),spec.get('weighted',False))
+            spec['watchguesses'] = list(watch['fit']['params'])
+        watch['results'] = recursivefitresults(watch['fit'])
+    watch['results']['file'] = watch['state']['file']
+
+#draw the fit of a watched file on its own figure, reusing the figure between renders, and save the graph in place
+def renderwatch(watch, spec, outfilepath='', xtitle='', ytitle=''):
+    x, y, err = watch['data'][:,:watch['n']]
+    results = dict(watch['results'])
+    results['fitvals'] = fitcurve(results,x)
+    results['residuals'] = y-results['fitvals']
+    if(watch['figure'] is None):
+        watch['figure'] = plt.figure(figsize=(9,6))
+    plottitle = spec.get('title') or os.path.splitext(os.path.basename(watch['state']['file']))[0]
+    drawfit(watch['figure'],x,y,err,results,xtitle,ytitle,plottitle,'x','blue','red','-',5)
+    watch['results']['image'] = savefigure(watch['figure'],outfilepath,plottitle)
+    watch['dirty'] = False
+
+#watch a directory for data files matching the patterns and keep a fit of each up to date as rows are appended, checking every interval seconds
+#updates only read and fit the new rows so they take the same time however large the files get, graphs and the results table are redrawn and rewritten in place at most every render seconds
+#a file that shrinks is taken to have been replaced and is fitted again from the start, updates limits how many checks are made which is mainly for testing
+def watchfolder(directory, spec, patterns=('*.txt','*.csv'), outfilepath='', xtitle='', ytitle='', resultspath='results.csv', interval=1.0, render=5.0, updates=None):
+    watched = {}
+    lastrender = -np.inf
+    check = 0
+    while(updates is None or check<updates):
+        start = time.perf_counter()
+        filepaths = sorted(set(i for pattern in patterns for i in glob.glob(os.path.join(directory,pattern)) if os.path.abspath(i)!=os.path.abspath(resultspath))) #the results table may be written to the same directory
+        for filepath in set(watched)-set(filepaths): #files that have been removed or renamed stop being watched
+            closewatch(watched.pop(filepath))
+        for filepath in filepaths:
+            if(filepath not in watched):
+                watched[filepath] = newwatch(filepath,spec)
+            watch = watched[filepath]
+            try:
+                size = os.path.getsize(filepath)
+                if(size<watch['state']['offset']):
+                    watch = watched[filepath] = newwatch(filepath,spec,watch)
+                if(size>watch['state']['offset']):
+                    updatewatch(watch,spec)
+                    watch.pop('errormessage',None)
+            except (OSError, ValueError, RuntimeError, np.linalg.LinAlgError) as error: #a bad file is reported once and the rest are still watched
+                if(watch.get('errormessage')!=str(error)):
+                    sys.stderr.write('%s: %s\n' % (filepath,error))
+                watch['errormessage'] = str(error)
+        if(time.perf_counter()-lastrender>=render and any(i['dirty'] and i['results'] is not None for i in watched.values())):
+            for watch in watched.values():
+                if(watch['dirty'] and watch['results'] is not None):
+                    renderwatch(watch,spec,outfilepath,xtitle,ytitle)
+            results = [i['results'] if 'errormessage' not in i else {'file': filepath, 'errormessage': i['errormessage']} for filepath, i in sorted(watched.items()) if i['results'] is not None or 'errormessage' in i]
+            atomicwrite(resultspath,lambda path: writeresults(results,path))
+            lastrender = time.perf_counter()
+        check += 1
+        time.sleep(max(0.0,interval-(time.perf_counter()-start)))
+    return watched
+
+#command line entry point for fitting many data files without the gui, run as python -m GeneralPlotter files... --power N or --equation EQN --params A,B --guesses 1,2
+def batchmain(argv):
+    parser = argparse.ArgumentParser(prog='python -m GeneralPlotter',description='Fit a polynomial or custom law to many comma separated x,y,y_err data files without the gui, saving a graph of each and a table of the fitting parameters.')
+    parser.add_argument('files',nargs='*',help='data files or glob patterns such as "Test Data/*.txt"')
+    parser.add_argument('--power',type=int,help='highest power of x for a polynomial fit')
+    parser.add_argument('--basis',default='power',choices=('power','scaled','chebyshev','legendre'),help='basis to fit polynomials in, any but power scale x onto -1 to 1 which keeps high powers and x values far from zero such as timestamps accurate')
+    parser.add_argument('--select',action='store_true',help='fit every power from 1 up to --power and keep the highest power whose extra term is significant by the F-test')
+    parser.add_argument('--equation',help='custom law equation in terms of x, the y = is implied')
+    parser.add_argument('--params',help='comma separated fitting parameter names used in the equation')
+    parser.add_argument('--guesses',help='comma separated guess values, one for each fitting parameter')
+    parser.add_argument('--outdir',default='',help='directory the graphs are saved to, defaults to the current directory')
+    parser.add_argument('--results',default='results.csv',help='csv file the table of fitting parameters is written to')
+    parser.add_argument('--title',help='graph title, defaults to the name of each data file')
+    parser.add_argument('--xlabel',default='',help='x axis label')
+    parser.add_argument('--ylabel',default='',help='y axis label')
+    parser.add_argument('--columns',type=int,default=3,choices=(3,4),help='number of columns in raw .bin data files, 4 if they hold x errors')
+    parser.add_argument('--convert',action='store_true',help='convert the text data files to memory mappable .npy files next to them and exit')
+    parser.add_argument('--gradient',help='comma separated x ordinates to find the gradient of the fit at')
+    parser.add_argument('--weighted',action='store_true',help='weight each point by its y error in the fit and take the errors as absolute')
+    parser.add_argument('--stream',action='store_true',help='fit polynomials by reading the files in chunks so files larger than memory can be fitted, no graphs are drawn')
+    parser.add_argument('--no-cache',dest='cache',action='store_false',help='always fit the files rather than reusing fits of the same data from the cache in %s' % cachedirectory)
+    parser.add_argument('--bounds',help='comma separated low:high bounds for each fitting parameter, searches the whole of the bounds from many starting points for the best fit rather than only starting from the guesses')
+    parser.add_argument('--starts',type=int,default=256,help='number of quasi random starting points spread over the bounds, rounded up to a power of two')
+    parser.add_argument('--evolution',action='store_true',help='also run a differential evolution search over the bounds and polish its result')
+    parser.add_argument('--bootstrap',type=int,default=0,help='number of resamples to bootstrap 95%% confidence intervals and correlations of the fitting parameters from')
+    parser.add_argument('--sweep',action='store_true',help='fit a custom law to the files in order, starting each fit from the solution of the file before, and write the parameter trajectory')
+    parser.add_argument('--trajectory',default='trajectory.csv',help='csv file a sweep writes the parameters of each file to, one row per file')
+    parser.add_argument('--no-compare',dest='compare',action='store_false',help='do not also fit each file of a sweep from the original guesses to report the evaluations saved')
+    parser.add_argument('--loss',default='linear',choices=('linear','soft_l1','huber','cauchy'),help='loss to fit with, anything but linear least squares stops outlying points dominating the fit')
+    parser.add_argument('--clip',type=float,default=0,help='clip points more than this many sigma from the fit and refit until none change, 0 for no clipping')
+    parser.add_argument('--odr',action='store_true',help='fit with the x errors in a fourth column as well as the y errors by orthogonal distance regression')
+    parser.add_argument('--shared',help='comma separated fitting parameters that take the same value in every file, fits the custom law to all of the files at once with the other parameters fitted to each file')
+    parser.add_argument('--watch',help='directory to watch, keeping a fit of every data file in it up to date as rows are appended until stopped with Ctrl+C')
+    parser.add_argument('--pattern',default='*.txt,*.csv',help='comma separated patterns of the file names to watch')
+    parser.add_argument('--interval',type=float,default=1.0,help='seconds between checks of the watched files for new rows')
+    parser.add_argument('--render',type=float,default=5.0,help='least number of seconds between redrawing the graphs and rewriting the results of watched files')
+    parser.add_argument('--export',help='also add a record of every fit, with its covariance, chi squared, timings and a hash of its data, to this csv, json lines, parquet or arrow table, parquet and arrow tables are directories of part files')
+    parser.add_argument('--format',choices=('csv','jsonl','parquet','arrow'),help='format of the --export table, taken from its extension if not given')
+    parser.add_argument('--workers',type=int,default=1,help='number of worker processes to fit files in parallel, 0 uses every core')
+    args = parser.parse_args(argv)
+    if(args.files==[] and args.watch is None):
+        parser.error('give at least one data file, or a directory to --watch')
+    
+    filepaths = []
+    for pattern in args.files: #expand glob patterns here as well so quoted patterns and shells that do not expand them both work
+        matches = sorted(glob.glob(pattern))
+        filepaths.extend(matches if matches!=[] else [pattern])
+    if(args.convert): #convert the files once then stop
+        for filepath in filepaths:
+            print('%s -> %s' % (filepath,convertdata(filepath)))
+        return 0
+    
+    if((args.power is None)==(args.equation is None)):
+        parser.error('give either --power for a polynomial fit or --equation with --params and --guesses for a custom law fit')
+    if(args.equation is not None):
+        if(args.stream):
+            parser.error('--stream only works for polynomial fits')
+        if(args.sweep and args.workers!=1):
+            parser.error('--sweep fits the files in order so cannot use more than one worker')
+        if(args.shared is not None and (args.sweep or args.bounds is not None or args.bootstrap>0)):
+            parser.error('--shared cannot be used with --sweep, --bounds or --bootstrap')
+        if(args.params is None or args.guesses is None):
+            parser.error('a custom law fit needs --params and --guesses')
+        userfittingparams = [i.strip() for i in args.params.split(',')]
+        try:
+            paramguesses = [float(i) for i in args.guesses.split(',')]
+            compileequation(args.equation,userfittingparams) #check the equation once before fitting any files
+        except ValueError as error:
+            parser.error(str(error))
+        if(len(paramguesses)!=len(userfittingparams)):
+            parser.error('give one guess for each fitting parameter')
+        spec = {'equation': args.equation, 'params': userfittingparams, 'guesses': paramguesses, 'title': args.title, 'columns': args.columns, 'weighted': args.weighted, 'cache': args.cache}
+        if(args.shared is not None):
+            spec['shared'] = [i.strip() for i in args.shared.split(',')]
+            if(not set(spec['shared'])<=set(userfittingparams)):
+                parser.error('--shared should only name fitting parameters given in --params')
+        if(args.starts<1):
+            parser.error('--starts must be at least 1')
+        if(args.bounds is not None):
+            try:
+                spec['bounds'] = parsebounds(args.bounds,len(userfittingparams))
+            except ValueError as error:
+                parser.error(str(error))
+            spec.update({'starts': args.starts, 'evolution': args.evolution})
+        elif(args.evolution):
+            parser.error('--evolution needs --bounds to search within')
+    else:
+        if(args.sweep or args.shared is not None):
+            parser.error('--sweep and --shared only work for custom law fits')
+        if(args.select and args.stream):
+            parser.error('--select cannot be used with --stream')
+        if(args.power<=0):
+            parser.error('--power must be a positive integer')
+        spec = {'power': args.power, 'title': args.title, 'columns': args.columns, 'weighted': args.weighted, 'cache': args.cache, 'stream': args.stream, 'select': args.select, 'basis': args.basis}
+    
+    if(args.loss!='linear' or args.clip>0):
+        if(args.stream or args.select or args.basis!='power' or args.bounds is not None or args.bootstrap>0 or args.shared is not None or args.odr):
+            parser.error('--loss and --clip cannot be used with --stream, --select, --basis, --bounds, --bootstrap, --shared or --odr')
+        spec.update({'loss': args.loss, 'clip': args.clip})
+    if(args.odr):
+        if(args.stream or args.select or args.basis!='power' or args.bounds is not None or args.bootstrap>0 or args.shared is not None):
+            parser.error('--odr cannot be used with --stream, --select, --basis, --bounds, --bootstrap or --shared')
+        spec['odr'] = True
+    spec['fitworkers'] = args.workers if len(filepaths)==1 else 1 #spread the work within a single file across the workers, several files are spread across them already
+    if(args.bootstrap>0):
+        if(args.stream):
+            parser.error('--bootstrap cannot be used with --stream')
+        spec['bootstrap'] = args.bootstrap
+    if(args.gradient is not None):
+        if(args.stream):
+            parser.error('--gradient cannot be used with --stream')
+        try:
+            spec['gradients'] = [float(i) for i in args.gradient.split(',')]
+        except ValueError:
+            parser.error('--gradient should be comma separated numbers')
+    if(args.export is not None):
+        exportformat = args.format or exportformats.get(os.path.splitext(args.export)[1].lower())
+        if(exportformat is None):
+            parser.error('give --format or an --export path ending .csv, .jsonl, .parquet or .arrow')
+        if(exportformat in ('parquet','arrow')):
+            try:
+                importlib.import_module('pyarrow')
+            except ImportError:
+                parser.error('exporting to %s needs pyarrow, install it with pip install pyarrow' % exportformat)
+    elif(args.format is not None):
+        parser.error('--format needs --export')
+    if(args.outdir!=''):
+        os.makedirs(args.outdir,exist_ok=True)
+    if(args.watch is not None):
+        if(args.export is not None):
+            parser.error('--export cannot be used with --watch')
+        if(args.files!=[] or args.stream or args.select or args.basis!='power' or spec.get('bounds') is not None or args.bootstrap>0 or args.sweep or args.shared is not None or args.odr or 'loss' in spec or args.workers!=1):
+            parser.error('--watch takes no files and cannot be used with --stream, --select, --basis, --bounds, --bootstrap, --sweep, --shared, --odr, --loss, --clip or --workers')
+        plt.switch_backend('Agg')
+        print('Watching %s, stop with Ctrl+C' % args.watch)
+        try:
+            watchfolder(args.watch,spec,[i.strip() for i in args.pattern.split(',')],args.outdir.replace("\\","/"),args.xlabel,args.ylabel,args.results,args.interval,args.render)
+        except KeyboardInterrupt:
+            print('Stopped watching %s' % args.watch)
+        return 0
+    
+    plt.switch_backend('Agg') #render straight to file, no display is needed
+    if(args.sweep):
+        results = sweepfit(filepaths,spec,args.outdir.replace("\\","/"),args.xlabel,args.ylabel,args.compare)
+        trajectory = sweeptrajectory(results,spec['params'])
+        writetrajectory(trajectory,args.trajectory)
+        print('Parameter trajectory written to %s' % args.trajectory)
+        if(args.compare):
+            compared = ~np.isnan(trajectory['coldnfev']) #only count files where both starts converged
+            warm = (np.sum(trajectory['nfev'][compared]),np.sum(trajectory['njev'][compared]))
+            cold = (np.sum(trajectory['coldnfev'][compared]),np.sum(trajectory['coldnjev'][compared]))
+            print('Warm starts: %d function and %d jacobian evaluations, cold starts: %d and %d, %.1f%% fewer function evaluations' % (warm[0],warm[1],cold[0],cold[1],100*(1-warm[0]/max(cold[0],1))))
+    elif(args.shared is not None):
+        try:
+            shared = sharedfitfiles(filepaths,spec,args.outdir.replace("\\","/"),args.xlabel,args.ylabel)
+        except (ValueError, RuntimeError) as error:
+            sys.stderr.write('%s\n' % error)
+            return 1
+        results = shared['datasets']
+        print('Shared fit of %d files, reduced chi squared %.6g, %d function and %d jacobian evaluations' % (sum('errormessage' not in i for i in results),shared['redchi2'],shared['nfev'],shared['njev']))
+        for i in range(0,len(shared['names'])):
+            print('%s: %.5e ± %.5e' % (shared['names'][i],shared['params'][i],shared['errors'][i]))
+    else:
+        results = batchfit(filepaths,spec,args.outdir.replace("\\","/"),args.xlabel,args.ylabel,args.workers)
+    writeresults(results,args.results)
+    failed = sum('errormessage' in result for result in results)
+    print('Fitted %d of %d files, results written to %s' % (len(results)-failed,len(results),args.results))
+    if(args.export is not None):
+        print('Fit records added to %s' % exportrecords([fitrecord(result) for result in results],args.export,exportformat))
+    if(args.cache and not args.stream and not args.sweep and args.shared is None and 'loss' not in spec and not args.odr): #count the hits from the results as parallel workers keep their own statistics
+        hits = sum(result.get('cached',False) for result in results)
+        print('Fit cache: %d hits, %d misses' % (hits,len(results)-failed-hits))
+    return 1 if failed else 0
+
 #insertion point for the code and definition of the home window
 if(__name__=='__main__'):
+    if(len(sys.argv)>1): #if any command line arguments are given run the headless batch fitting instead of the gui
+        sys.exit(batchmain(sys.argv[1:]))
+    from tkinter import * #only the window needs tkinter, so batch fitting still works on machines without it
+    plt.onload = ipythonbackend #set graphs to display in window instead of console when running inside ipython, once the first graph is drawn
     root = Tk() #define root as main window
     root.title('General Graph Plotter') #set title of root
     #display some information about the code
@@ -710,14 +2547,21 @@ if(__name__=='__main__'):
 
     #label entry combos explaining you must enter the directory of the data file and an entry to do so
     path = StringVar()
-    loadlabel = Label(dataframe,text='Data Directory + File, Can Be\n.txt or .csv: ',relief='solid').grid(row=0,column=0,sticky='nsew')
+    loadlabel = Label(dataframe,text='Data Directory + File, Can Be\n.txt, .csv, .npy, .npz or .bin: ',relief='solid').grid(row=0,column=0,sticky='nsew')
     dataentry = Entry(dataframe,textvariable=path,relief='solid').grid(row=0,column=1,sticky='nsew')
-    infolabel6 = Label(dataframe,text='Please paste path to comma\nseperated data in format x,y,y_error',relief='solid').grid(row=0,column=2,sticky='nsew')
+    infolabel6 = Label(dataframe,text='Please paste path to comma\nseperated data in format x,y,y_error\nor x,y,y_error,x_error',relief='solid').grid(row=0,column=2,sticky='nsew')
      #label entry combos explaining you must enter the directory to output the file to and an entry to do so
     outpath = StringVar()
     outlabel = Label(dataframe,text='Graph Output Location: ',relief='solid').grid(row=1,column=0,sticky='nsew')
     outentry = Entry(dataframe,textvariable=outpath,relief='solid').grid(row=1,column=1,sticky='nsew')
-    infolabel7 = Label(dataframe,text='Please paste path where graph should output,\nfile name will be same as graph title',relief='solid').grid(row=1,column=2,sticky='nsew')
+    infolabel7 = Label(dataframe,text='Please paste path where graph should output,\nfile name will be same as graph title,\na record of each fit is added to results.jsonl there',relief='solid').grid(row=1,column=2,sticky='nsew')
+    #label and drop down menu for the number of columns in a raw .bin file, which has no header to say how its values are laid out
+    columnslabel = Label(dataframe,text='Columns In Raw .bin Files: ',relief='solid').grid(row=2,column=0,sticky='nsew')
+    columnsvar = StringVar()
+    columnsvar.set('3')
+    columnsmenu = OptionMenu(dataframe,columnsvar,'3','4')
+    columnsmenu.grid(row=2,column=1,sticky='nsew')
+    infolabel8 = Label(dataframe,text='3 for x,y,y_error or 4 for x,y,y_error,x_error,\nother file types find their own columns',relief='solid').grid(row=2,column=2,sticky='nsew')
     
     
     polyframe = Frame(root) #create frame for the polynomial entries and labels
@@ -736,7 +2580,7 @@ if(__name__=='__main__'):
     powerentry = Entry(polyframe,textvariable=powervar,relief='solid').grid(row=1,column=2,sticky='nsew')
     
     #info about gradient
-    gradientinfo = Label(polyframe,text='If graph is not linear and a gradient at a point is desired, type\nthe X ordinate of the point at which you\nwant the gradient.',relief='solid')
+    gradientinfo = Label(polyframe,text='If a gradient at a point is desired, type\nthe X ordinate of the point at which you\nwant the gradient, separate several with commas.',relief='solid')
     gradientinfo.grid(row=2,column=0,columnspan=3,sticky='nsew')
     
     #label and entry for gradient of polynomial
@@ -744,6 +2588,17 @@ if(__name__=='__main__'):
     gradvar = StringVar()
     gradentry = Entry(polyframe,textvariable=gradvar,relief='solid').grid(row=3,column=2,sticky='nsew')
     
+    #tick box to try every power up to the highest power and keep the best
+    selectvar = IntVar()
+    selectbutton = Checkbutton(polyframe, text='Choose Best Power Up To Highest Power', variable=selectvar, relief='solid').grid(row=4,column=0,columnspan=3,sticky='nsew')
+    
+    #label and drop down menu for the basis the polynomial is fitted in, the scaled bases stay accurate for high powers and x values far from zero
+    basislabel = Label(polyframe,text='Polynomial Basis: ',relief='solid').grid(row=5,column=0,columnspan=2,sticky='nsew')
+    basisvar = StringVar()
+    basisvar.set('Power')
+    basismenu = OptionMenu(polyframe,basisvar,'Power','Scaled Power','Chebyshev','Legendre')
+    basismenu.grid(row=5,column=2,sticky='nsew')
+    
     #label and entry for equation of custom law
     equationlabel = Label(customframe,text='Custom Equation: y = ',relief='solid').grid(row=1,column=0,columnspan=2,sticky='nsew')
     equationvar = StringVar()
@@ -759,8 +2614,17 @@ if(__name__=='__main__'):
     paramsguessvar = StringVar()
     paramsguessentry = Entry(customframe,textvariable=paramsguessvar,relief='solid').grid(row=3,column=3,sticky='nsew')
     
+    #label and entry for optional bounds of each fitting parameter, if given the fit searches the whole of the bounds for the best fit
+    boundslabel = Label(customframe,text='Parameter Bounds (optional): ',relief='solid').grid(row=4,column=0,columnspan=2,sticky='nsew')
+    boundsvar = StringVar()
+    boundsentry = Entry(customframe,textvariable=boundsvar,relief='solid').grid(row=4,column=3,sticky='nsew')
+    
+    #tick box to add a differential evolution search to the bounded search
+    evolutionvar = IntVar()
+    evolutionbutton = Checkbutton(customframe, text='Differential Evolution Search Within Bounds', variable=evolutionvar, relief='solid').grid(row=5,column=0,columnspan=4,sticky='nsew')
+    
     #button for help with custom mode that opens the help window
-    customhelpbutton = Button(customframe, text='Custom Help',command = customhelp).grid(row=4,column=0,columnspan=4,sticky='nsew')
+    customhelpbutton = Button(customframe, text='Custom Help',command = customhelp).grid(row=6,column=0,columnspan=4,sticky='nsew')
     
     #blank to increase spacing of widgets
     blanklabel = Label(dataframe,text='').grid(row=2,column=0,columnspan=3,sticky='nsew')
@@ -790,16 +2654,50 @@ if(__name__=='__main__'):
     linestyle1 = StringVar()
     markersize1 = StringVar()
     
+    #tick box to weight the fit by the y errors, off by default to fit as before
+    weightvar = IntVar()
+    weightbutton = Checkbutton(root, text='Weighted Fit (weight points by their y errors)', variable=weightvar, relief='solid').grid(row=8,column=1,sticky='nsew')
+    
+    #tick box to bootstrap confidence intervals of the fitting parameters, off by default as it refits the data many times
+    bootstrapvar = IntVar()
+    bootstrapbutton = Checkbutton(root, text='Bootstrap 95% Intervals (1000 resamples)', variable=bootstrapvar, relief='solid').grid(row=8,column=2,sticky='nsew')
+    
+    #tick box to fit with the x errors in a fourth column of the data as well as the y errors
+    odrvar = IntVar()
+    odrbutton = Checkbutton(root, text='Use X Errors (orthogonal distance regression)', variable=odrvar, relief='solid').grid(row=8,column=0,sticky='nsew')
+    
+    #frame with the loss to fit with and the sigma to clip outlying points beyond, so a few bad points do not spoil the fit
+    robustframe = Frame(root)
+    robustframe.grid(row=9,column=0,sticky='nsew')
+    losslabel = Label(robustframe,text='Fit Loss: ',relief='solid').grid(row=0,column=0,sticky='nsew')
+    lossvar = StringVar()
+    lossvar.set('Least Squares')
+    lossmenu = OptionMenu(robustframe,lossvar,'Least Squares','Soft L1','Huber','Cauchy')
+    lossmenu.grid(row=0,column=1,sticky='nsew')
+    cliplabel = Label(robustframe,text='Clip Beyond Sigma (optional): ',relief='solid').grid(row=1,column=0,sticky='nsew')
+    clipvar = StringVar()
+    clipentry = Entry(robustframe,textvariable=clipvar,relief='solid').grid(row=1,column=1,sticky='nsew')
+    
     #button that calls the plotting functoin to begin processing data entered labelled plot
-    plotbutton = Button(root, text='Plot',command=lambda: plot(path,v,powervar,gradvar,equationvar,fittingparamsvar,paramsguessvar,xtitlevar,ytitlevar,titlevar,outpath,markerstyle, markercolour, errorcolour, linestyle1, markersize1))
+    plotbutton = Button(root, text='Plot',command=lambda: plot(path,v,powervar,gradvar,equationvar,fittingparamsvar,paramsguessvar,xtitlevar,ytitlevar,titlevar,outpath,markerstyle, markercolour, errorcolour, linestyle1, markersize1, weightvar, boundsvar, evolutionvar, bootstrapvar, selectvar, basisvar, odrvar, lossvar, clipvar, columnsvar))
     plotbutton.grid(row=9,column=1,sticky='nsew')
     
+    #progress of the fit running in the background and a button to stop it, fits run on their own thread so the window keeps responding
+    fitexecutor = ThreadPoolExecutor(max_workers=1)
+    fitprogress = None
+    progresslabel = Label(root,text='')
+    progresslabel.grid(row=10,column=1,sticky='nsew')
+    cancelbutton = Button(root, text='Cancel',command=cancelfit,state='disabled')
+    cancelbutton.grid(row=10,column=2,sticky='nsew')
+    
     #blank label to increase widget spacing
     blank = Label(root,text='').grid(row=11,column=1,sticky='nsew')
     
     #add frame for advanced tab
     advancedframe = Frame(root,width = 121)
     advancedframe.grid(row=12,column=2,columnspan=2,sticky='n')
+    subadvancedframe = None #the advanced options and fitting parameter frames are made the first time they are needed then reused
+    paramsframe = None
 
     #add text to display advanced styling options, interactable to show and hide on click
     advancedstring = StringVar()